@@ -0,0 +1,137 @@
+"""
+Accuracy / latency comparison of CV inference backends against the
+ultralytics model.predict reference path.
+
+    python -m benchmarks.backend_compare --frames-dir recordings/walk1
+    python -m benchmarks.backend_compare --backends ultralytics onnxruntime openvino --int8
+
+Accuracy is reported relative to the reference backend (the first one
+listed): detections match when they share a class and have IoU >= 0.5.
+Latency is per frame at each batch size, on CPU.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from services.cv_service import INFERENCE_BACKENDS, TRACKED_CLASSES, BackendSpec, _box_iou, _percentiles, create_backend
+
+
+def load_frames(frames_dir: Optional[str], limit: int) -> List[np.ndarray]:
+    if frames_dir:
+        files = sorted(p for p in Path(frames_dir).iterdir() if p.suffix.lower() in (".jpg", ".jpeg", ".png"))
+    else:
+        from ultralytics.utils import ASSETS
+
+        files = sorted(Path(ASSETS).glob("*.jpg"))
+    frames = [f for f in (cv2.imread(str(p)) for p in files[:limit]) if f is not None]
+    if not frames:
+        raise SystemExit("no frames to benchmark")
+    return frames
+
+
+def match(ref: np.ndarray, cand: np.ndarray, iou_threshold: float = 0.5) -> Dict[str, float]:
+    """Greedy same-class IoU matching of candidate detections against the reference ones."""
+    if len(ref) == 0 or len(cand) == 0:
+        return {"tp": 0, "ref": len(ref), "cand": len(cand), "iou_sum": 0.0}
+    iou = _box_iou(ref[:, :4], cand[:, :4])
+    iou[ref[:, None, 5] != cand[None, :, 5]] = 0.0
+    tp, iou_sum = 0, 0.0
+    while True:
+        r, c = np.unravel_index(np.argmax(iou), iou.shape)
+        if iou[r, c] < iou_threshold:
+            break
+        tp += 1
+        iou_sum += float(iou[r, c])
+        iou[r, :] = 0.0
+        iou[:, c] = 0.0
+    return {"tp": tp, "ref": len(ref), "cand": len(cand), "iou_sum": iou_sum}
+
+
+def time_backend(backend: Any, frames: List[np.ndarray], batch_size: int, repeats: int) -> Dict[str, Any]:
+    per_frame_ms: List[float] = []
+    for _ in range(repeats):
+        for i in range(0, len(frames), batch_size):
+            batch = frames[i:i + batch_size]
+            started = time.perf_counter()
+            backend.detect(batch)
+            per_frame_ms.append((time.perf_counter() - started) * 1000.0 / len(batch))
+    return _percentiles(per_frame_ms)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--backends", nargs="+", default=list(INFERENCE_BACKENDS[:2]), choices=INFERENCE_BACKENDS)
+    p.add_argument("--frames-dir", help="directory of frames (default: ultralytics sample images)")
+    p.add_argument("--limit", type=int, default=64, help="max frames to load")
+    p.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8])
+    p.add_argument("--repeats", type=int, default=3)
+    p.add_argument("--conf", type=float, default=0.5)
+    p.add_argument("--int8", action="store_true", help="use int8-quantized OpenVINO export")
+    p.add_argument("--json", action="store_true")
+    args = p.parse_args(argv)
+
+    frames = load_frames(args.frames_dir, args.limit)
+    report: Dict[str, Any] = {"frames": len(frames), "backends": {}}
+    reference: Optional[List[np.ndarray]] = None
+    for kind in args.backends:
+        spec = BackendSpec(
+            kind=kind,
+            model_path=os.getenv("YOLO_MODEL", "yolov8n.pt"),
+            device="cpu",
+            classes=list(TRACKED_CLASSES),
+            conf=args.conf,
+            int8=args.int8,
+        )
+        backend = create_backend(spec)
+        backend.detect(frames[:1])  # warmup
+        dets = [d for f in frames for d in backend.detect([f])]
+        entry: Dict[str, Any] = {
+            "latency_ms_per_frame": {
+                str(bs): time_backend(backend, frames, bs, args.repeats) for bs in args.batch_sizes
+            },
+            "detections": int(sum(len(d) for d in dets)),
+        }
+        if reference is None:
+            reference = dets
+        else:
+            totals = {"tp": 0, "ref": 0, "cand": 0, "iou_sum": 0.0}
+            for ref, cand in zip(reference, dets):
+                for k, v in match(ref, cand).items():
+                    totals[k] += v
+            precision = totals["tp"] / totals["cand"] if totals["cand"] else None
+            recall = totals["tp"] / totals["ref"] if totals["ref"] else None
+            entry["vs_reference"] = {
+                "precision": precision,
+                "recall": recall,
+                "f1": (2 * precision * recall / (precision + recall)) if precision and recall else None,
+                "mean_iou": totals["iou_sum"] / totals["tp"] if totals["tp"] else None,
+            }
+        report["backends"][kind] = entry
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"frames={report['frames']} reference={args.backends[0]}")
+        for kind, entry in report["backends"].items():
+            lat = ", ".join(
+                f"bs={bs}: p50={v['p50']:.1f} p95={v['p95']:.1f}" for bs, v in entry["latency_ms_per_frame"].items()
+            )
+            acc = entry.get("vs_reference")
+            acc_s = (
+                f" precision={acc['precision']} recall={acc['recall']} mean_iou={acc['mean_iou']}" if acc else ""
+            )
+            print(f"{kind:12s} dets={entry['detections']} ms/frame [{lat}]{acc_s}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""
+CV pipeline benchmark: drives CVService with N synthetic sessions.
+
+Runs offline on a CPU-only box by default (stub detector + stub Gemini
+client); pass --backend ultralytics|onnxruntime|openvino to benchmark the
+actual YOLO_MODEL weights on CPU instead.
+
+    python -m benchmarks.cv_bench --sessions 30 --fps 10 --duration 20
+    python -m benchmarks.cv_bench --frames-dir recordings/walk1 --max-p95-ms 250
+
+Exits non-zero when --min-fps / --max-p95-ms gates fail, so it can guard
+deployments against regressions.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import resource
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from services.cv_service import BackendSpec, CVService, InferenceBackend, _percentiles, create_backend
+
+# COCO names for the classes CVService tracks
+STUB_NAMES: Dict[int, str] = {
+    0: "person", 1: "bicycle", 2: "car", 3: "motorcycle", 5: "bus", 6: "train", 7: "truck",
+    8: "boat", 9: "traffic light", 11: "stop sign", 12: "parking meter", 13: "bench", 15: "cat",
+    16: "dog", 56: "chair", 57: "couch", 59: "bed", 60: "dining table", 61: "toilet", 62: "tv",
+    71: "sink", 72: "refrigerator", 74: "clock",
+}
+
+
+class StubBackend(InferenceBackend):
+    """
+    Cheap deterministic detector: splits the frame into horizontal strips
+    and reports one box per strip around its brightest column band. On the
+    synthetic sequence this follows the moving rectangles.
+    """
+
+    def __init__(self, objects: int = 4, base_ms: float = 5.0, per_frame_ms: float = 2.0) -> None:
+        self.names = STUB_NAMES
+        self.objects = objects
+        self.base_ms = base_ms
+        self.per_frame_ms = per_frame_ms
+        self._classes = list(STUB_NAMES)
+
+    def _detect(self, frame: np.ndarray) -> np.ndarray:
+        h, w = frame.shape[:2]
+        strip = h // self.objects
+        rows = []
+        for k in range(self.objects):
+            band = frame[k * strip:(k + 1) * strip:8, ::8].mean(axis=(0, 2))
+            xc = (float(np.argmax(band)) + 0.5) * 8
+            half = w * 0.1
+            cls = self._classes[k % len(self._classes)]
+            rows.append([max(0.0, xc - half), k * strip, min(w, xc + half), (k + 1) * strip, 0.9, cls])
+        return np.array(rows, dtype=np.float32).reshape(-1, 6)
+
+    def detect(self, frames: List[np.ndarray]) -> List[np.ndarray]:
+        time.sleep((self.base_ms + self.per_frame_ms * len(frames)) / 1000.0)
+        return [self._detect(f) for f in frames]
+
+
+class StubGenAI:
+    """Stands in for genai.Client: fixed latency, canned text."""
+
+    def __init__(self, latency_ms: float = 400.0) -> None:
+        self.latency_ms = latency_ms
+        self.calls = 0
+        self.models = self
+
+    def generate_content(self, model: str, contents: Any) -> Any:
+        self.calls += 1
+        time.sleep(self.latency_ms / 1000.0)
+        return SimpleNamespace(text=f"stub summary {self.calls}")
+
+
+def synthetic_sequence(n_frames: int, objects: int, width: int = 640, height: int = 480) -> List[bytes]:
+    strip = height // objects
+    out: List[bytes] = []
+    for i in range(n_frames):
+        frame = np.full((height, width, 3), 40, dtype=np.uint8)
+        for k in range(objects):
+            # Each object sweeps left-right at its own speed and size
+            span = width - 120
+            x = int((i * (3 + 2 * k)) % (2 * span))
+            x = x if x < span else 2 * span - x
+            grow = 40 + int(30 * (1 + np.sin(i / (10 + k))))
+            cv2.rectangle(frame, (x, k * strip + 5), (x + grow, (k + 1) * strip - 5), (230, 230, 230), -1)
+        ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
+        if ok:
+            out.append(buf.tobytes())
+    return out
+
+
+def load_sequence(frames_dir: Path) -> List[bytes]:
+    files = sorted(p for p in frames_dir.iterdir() if p.suffix.lower() in (".jpg", ".jpeg"))
+    if not files:
+        raise SystemExit(f"no JPEG frames in {frames_dir}")
+    return [p.read_bytes() for p in files]
+
+
+def rss_mb() -> float:
+    """Current resident set size; falls back to the ru_maxrss high-water mark without /proc."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024.0 * 1024.0)
+    except (OSError, ValueError):
+        # ru_maxrss is KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+async def warm_up(svc: CVService, frame: bytes, timeout_s: float = 30.0) -> None:
+    """Push one frame through a throwaway session so lazy init is not counted as per-session memory."""
+    sid = await svc.start_session({})
+    await svc.enqueue_frames(sid, [frame])
+    deadline = time.perf_counter() + timeout_s
+    while not any(sched.metrics()["frames_total"] for sched in svc._schedulers) and time.perf_counter() < deadline:
+        await asyncio.sleep(0.01)
+    await svc.stop_session(sid)
+
+
+async def drive_session(svc: CVService, sid: str, seq: List[bytes], offset: int, fps: float, duration: float) -> int:
+    period = 1.0 / fps
+    sent = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        frame = seq[(offset + sent) % len(seq)]
+        await svc.enqueue_frames(sid, [frame], [time.time()])
+        sent += 1
+        next_at = start + sent * period
+        await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+    return sent
+
+
+async def sample_queues(svc: CVService, samples: Dict[str, List[int]], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        samples["session"].extend(st.queue.qsize() for st in list(svc._sessions.values()))
+        samples["scheduler"].extend(sched.metrics()["pending"] for sched in svc._schedulers)
+        await asyncio.sleep(0.1)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    seq = load_sequence(Path(args.frames_dir)) if args.frames_dir else synthetic_sequence(300, args.objects)
+    backend: InferenceBackend
+    if args.backend == "stub":
+        backend = StubBackend(args.objects, args.model_base_ms, args.model_frame_ms)
+    else:
+        classes = list(STUB_NAMES)
+        backend = create_backend(
+            BackendSpec(kind=args.backend, model_path=os.getenv("YOLO_MODEL", "yolov8n.pt"), classes=classes)
+        )
+    genai_client = StubGenAI(args.llm_ms)
+
+    svc = CVService(summary_interval_s=args.summary_interval_s, backend=backend, genai_client=genai_client)
+    await svc.wait_ready()
+    await warm_up(svc, seq[0])
+    warmup_frames = sum(sched.metrics()["frames_total"] for sched in svc._schedulers)
+    gc.collect()
+    # Baseline after model load, warmup and the first batch; the delta is what the sessions cost
+    rss_before = rss_mb()
+    sids = [await svc.start_session({"queue_policy": args.queue_policy}) for _ in range(args.sessions)]
+    states = [svc._sessions[sid] for sid in sids]
+
+    summaries = {"local": 0, "llm": 0}
+
+    async def consume(sub: Any) -> None:
+        while (payload := await sub.get()) is not None:
+            source = json.loads(payload)["extra"].get("source", "llm")
+            summaries[source] = summaries.get(source, 0) + 1
+
+    consumers = [asyncio.create_task(consume(await svc.subscribe(sid))) for sid in sids]
+
+    samples: Dict[str, List[int]] = {"session": [], "scheduler": []}
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_queues(svc, samples, stop))
+    started = time.perf_counter()
+    sent = await asyncio.gather(
+        *[drive_session(svc, sid, seq, i * 7, args.fps, args.duration) for i, sid in enumerate(sids)]
+    )
+    # Let in-flight work drain before reading counters
+    await asyncio.sleep(args.drain_s)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await sampler
+
+    frame_ages = [age for st in states for age in st.frame_ages_ms]
+    processed = sum(sched.metrics()["frames_total"] for sched in svc._schedulers) - warmup_frames
+    gc.collect()
+    rss_after = rss_mb()
+    report = {
+        "sessions": args.sessions,
+        "fps_per_session": args.fps,
+        "duration_s": args.duration,
+        "frames_sent": sum(sent),
+        "frames_processed": processed,
+        "frames_dropped": sum(st.frames_dropped for st in states),
+        "frames_skipped": sum(st.gate.skipped for st in states),
+        "throughput_fps": processed / elapsed,
+        "frame_to_event_ms": _percentiles(frame_ages),
+        "session_queue_depth": {"mean": float(np.mean(samples["session"] or [0])), "max": max(samples["session"] or [0])},
+        "scheduler_queue_depth": {"mean": float(np.mean(samples["scheduler"] or [0])), "max": max(samples["scheduler"] or [0])},
+        "scene_objects_per_session": float(np.mean([len(st.scene) for st in states])),
+        "rss_mb_per_session": (rss_after - rss_before) / max(1, args.sessions),
+        "summaries": summaries,
+        "llm_calls": genai_client.calls,
+        "metrics": svc.get_metrics() if args.verbose else None,
+    }
+    await svc.shutdown()
+    await asyncio.gather(*consumers)
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--sessions", type=int, default=30)
+    p.add_argument("--fps", type=float, default=10.0, help="frames per second per session")
+    p.add_argument("--duration", type=float, default=10.0, help="seconds of traffic per session")
+    p.add_argument("--drain-s", type=float, default=1.0)
+    p.add_argument("--frames-dir", help="directory of recorded JPEG frames to replay (default: synthetic)")
+    p.add_argument("--objects", type=int, default=4, help="objects per synthetic/stub frame")
+    p.add_argument(
+        "--backend", default="stub", choices=["stub", "ultralytics", "onnxruntime", "openvino"],
+        help="detector to run; anything but stub loads YOLO_MODEL on CPU",
+    )
+    p.add_argument("--model-base-ms", type=float, default=5.0, help="stub detector cost per batch")
+    p.add_argument("--model-frame-ms", type=float, default=2.0, help="stub detector cost per frame")
+    p.add_argument("--llm-ms", type=float, default=400.0, help="stub Gemini latency")
+    p.add_argument("--summary-interval-s", type=float, default=3.0)
+    p.add_argument("--queue-policy", default="latest")
+    p.add_argument("--min-fps", type=float, help="fail if throughput is below this")
+    p.add_argument("--max-p95-ms", type=float, help="fail if p95 frame-to-event latency exceeds this")
+    p.add_argument("--json", action="store_true", help="print the report as JSON")
+    p.add_argument("--verbose", action="store_true", help="include CVService.get_metrics() in the report")
+    args = p.parse_args(argv)
+
+    os.environ.setdefault("CV_WORKERS", "0")
+    report = asyncio.run(run(args))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        lat = report["frame_to_event_ms"]
+        print(f"sessions={report['sessions']} fps/session={report['fps_per_session']} duration={report['duration_s']}s")
+        print(f"frames sent={report['frames_sent']} processed={report['frames_processed']} dropped={report['frames_dropped']} skipped={report['frames_skipped']}")
+        print(f"throughput={report['throughput_fps']:.1f} frames/s")
+        print(f"frame->event ms p50={lat['p50']} p95={lat['p95']} p99={lat['p99']}")
+        print(f"session queue depth mean={report['session_queue_depth']['mean']:.2f} max={report['session_queue_depth']['max']}")
+        print(f"scheduler queue depth mean={report['scheduler_queue_depth']['mean']:.2f} max={report['scheduler_queue_depth']['max']}")
+        print(f"scene objects/session={report['scene_objects_per_session']:.1f} RSS/session={report['rss_mb_per_session']:.2f} MB")
+        print(f"summaries={report['summaries']} llm_calls={report['llm_calls']}")
+
+    failed = False
+    if args.min_fps is not None and report["throughput_fps"] < args.min_fps:
+        print(f"FAIL: throughput {report['throughput_fps']:.1f} < {args.min_fps}", file=sys.stderr)
+        failed = True
+    p95 = report["frame_to_event_ms"]["p95"]
+    if args.max_p95_ms is not None and (p95 is None or p95 > args.max_p95_ms):
+        print(f"FAIL: p95 frame->event {p95} ms > {args.max_p95_ms}", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
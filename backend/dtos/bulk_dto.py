@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import List
+
+class BulkRejectionDTO(BaseModel):
+    index: int  # position in the JSON array, or line number (from 0) in NDJSON
+    detail: str
+
+class BulkResultDTO(BaseModel):
+    inserted: int = 0
+    rejected: int = 0  # failed validation
+    failed: int = 0  # valid, but MongoDB refused the insert (e.g. a duplicate _id)
+    errors: List[BulkRejectionDTO] = []  # the first rejections only
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 
 class StartSessionRequest(BaseModel):
     sampling_rate: Optional[int] = Field(default=None, description="Frontend sampling rate N (every N frames)")
     summary_interval_s: Optional[float] = Field(default=None, description="Override server summary interval")
+    queue_policy: Optional[Literal["bounded", "drop_oldest", "latest"]] = Field(
+        default=None, description="Backpressure policy when inference falls behind"
+    )
+    queue_maxsize: Optional[int] = Field(default=None, ge=1, description="Pending payloads kept by bounded policies")
 
 
 class StartSessionResponse(BaseModel):
@@ -1,5 +1,16 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Optional
 
 class ReviewDTO(BaseModel):
     poi_id: str
     review_text: str
+
+class ReviewListingDTO(BaseModel):
+    id: str = Field(alias="_id")
+    review_text: str
+    created_at: datetime
+
+class ReviewPageDTO(BaseModel):
+    reviews: List[ReviewListingDTO] = []
+    next_cursor: Optional[str] = None  # pass back as `cursor` for the next (older) page
@@ -0,0 +1,37 @@
+"""
+One-shot backfill of the GeoJSON `location` field on POIs stored before it
+existed, so the 2dsphere index covers them.
+
+    python -m jobs.backfill_poi_locations
+
+New POIs get `location` from latitude/longitude when they are created.
+"""
+import asyncio
+
+from beanie import init_beanie
+from dotenv import load_dotenv
+from loguru import logger
+from motor.motor_asyncio import AsyncIOMotorClient
+from os import getenv
+
+from models.poi import POI
+
+
+async def main():
+    load_dotenv()
+    mongo_client = AsyncIOMotorClient(getenv("MONGODB_URI"))
+    await init_beanie(
+        database=mongo_client['navi-cluster'], # type: ignore
+        document_models=[POI]
+    )
+    # Pipeline update: the server builds the point from each document's own fields
+    result = await POI.get_pymongo_collection().update_many(
+        {"location": {"$exists": False}},
+        [{"$set": {"location": {"type": "Point", "coordinates": ["$longitude", "$latitude"]}}}],
+    )
+    logger.info(f"Set location on {result.modified_count} POIs")
+    mongo_client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,36 @@
+"""
+One-shot rebuild of poi_rating_aggregates from the poi_ratings collection.
+
+    python -m jobs.backfill_rating_aggregates
+
+Run once after deploying rating aggregates, or to repair drift. Ratings
+inserted while it runs can be lost from the totals, so pause rating writes
+for the duration.
+"""
+import asyncio
+
+from beanie import init_beanie
+from dotenv import load_dotenv
+from loguru import logger
+from motor.motor_asyncio import AsyncIOMotorClient
+from os import getenv
+
+from models.poi_ratings import POIRating
+from models.poi_rating_aggregate import POIRatingAggregate
+from services.ratings_service import RatingsService
+
+
+async def main():
+    load_dotenv()
+    mongo_client = AsyncIOMotorClient(getenv("MONGODB_URI"))
+    await init_beanie(
+        database=mongo_client['navi-cluster'], # type: ignore
+        document_models=[POIRating, POIRatingAggregate]
+    )
+    written = await RatingsService().backfill_aggregates()
+    logger.info(f"Rebuilt rating aggregates for {written} POIs")
+    mongo_client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,41 @@
+"""
+One-shot (re)build of per-POI review sentence embeddings from the reviews
+collection, for reviews written before embeddings existed or from the old
+per-sentence document layout. After switching REVIEW_EMBEDDER /
+REVIEW_EMBEDDING_MODEL it is optional: each POI is re-embedded on first
+use, and this does them all up front.
+
+    python -m jobs.backfill_review_embeddings
+"""
+import asyncio
+
+from beanie import init_beanie
+from dotenv import load_dotenv
+from loguru import logger
+from motor.motor_asyncio import AsyncIOMotorClient
+from os import getenv
+from pymongo import ASCENDING
+
+from models.review import Review
+from models.review_embedding import POIReviewEmbeddings
+from services.reviews_service import ReviewsService
+
+
+async def main():
+    load_dotenv()
+    mongo_client = AsyncIOMotorClient(getenv("MONGODB_URI"))
+    await init_beanie(
+        database=mongo_client['navi-cluster'], # type: ignore
+        document_models=[Review, POIReviewEmbeddings]
+    )
+    index = ReviewsService().embeddings
+    poi_ids = await Review.get_pymongo_collection().distinct("poi_id")
+    for n, poi_id in enumerate(poi_ids, 1):
+        reviews = await Review.find(Review.poi_id == poi_id).sort([("created_at", ASCENDING)]).to_list()
+        stored = await index.rebuild(poi_id, [(r.id, r.review_text) for r in reviews])
+        logger.info(f"[{n}/{len(poi_ids)}] {poi_id}: {stored} sentences")
+    mongo_client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
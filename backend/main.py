@@ -7,16 +7,19 @@ from dotenv import load_dotenv; load_dotenv()
 from models.review import Review
 from models.poi_ratings import POIRating
 from models.poi import POI
+from models.poi_profile import POIProfile
+from models.poi_rating_aggregate import POIRatingAggregate
+from models.review_embedding import POIReviewEmbeddings
 
 from routers.places_router import router as places_router
 from routers.ratings_router import router as ratings_router 
 from routers.reviews_router import router as reviews_router
 from routers.cv_router import router as cv_router
 
-from services.places_service import init_places_service
-from services.ratings_service import init_ratings_service
-from services.reviews_service import init_reviews_service
-from services.cv_service import init_cv_service
+from services.places_service import init_places_service, get_places_service
+from services.ratings_service import init_ratings_service, get_ratings_service
+from services.reviews_service import init_reviews_service, get_reviews_service
+from services.cv_service import init_cv_service, get_cv_service
 
 from dotenv import load_dotenv
 from os import getenv
@@ -35,7 +38,10 @@ async def lifespan(app: FastAPI):
         document_models=[
             Review,
             POIRating,
-            POI
+            POI,
+            POIProfile,
+            POIRatingAggregate,
+            POIReviewEmbeddings
         ]
     )
     logger.info("Connected to MongoDB Cluster.")  # Confirm connection
@@ -52,6 +58,11 @@ async def lifespan(app: FastAPI):
     yield
 
     logger.info("Shutting down application lifespan...")
+    await get_cv_service().shutdown()
+    # Buffered writes are flushed while the places service can still take their invalidations
+    await get_reviews_service().shutdown()
+    await get_ratings_service().shutdown()
+    await get_places_service().shutdown()
     logger.info("Closing MongoDB connection...")
     mongo_client.close()
 
@@ -1,6 +1,11 @@
 from beanie import Document
-from pydantic import Field
-from typing import List
+from pydantic import BaseModel, Field, model_validator
+from pymongo import GEOSPHERE, IndexModel
+from typing import List, Literal, Optional
+
+class GeoPoint(BaseModel):
+    type: Literal["Point"] = "Point"
+    coordinates: List[float]  # GeoJSON order: [longitude, latitude]
 
 class POI(Document):
     id: str = Field(alias="_id")
@@ -8,6 +13,15 @@ class POI(Document):
     categories: List[str] = []
     latitude: float
     longitude: float
+    location: Optional[GeoPoint] = None  # filled from latitude/longitude; backs the 2dsphere index
+    review_version: int = 0  # bumped on every new review; keys generated profiles
+
+    @model_validator(mode="after")
+    def fill_location(self):
+        if self.location is None:
+            self.location = GeoPoint(coordinates=[self.longitude, self.latitude])
+        return self
 
     class Settings:
-        name = "pois"  # Collection name in MongoDB
\ No newline at end of file
+        name = "pois"  # Collection name in MongoDB
+        indexes = [IndexModel([("location", GEOSPHERE)])]
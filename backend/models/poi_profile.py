@@ -0,0 +1,24 @@
+from beanie import Document
+from datetime import datetime, timezone
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+from typing import List
+from .category_enum import DisabilityCategory
+
+class POIProfile(Document):
+    '''
+    generated accessibility summary and review excerpts for a point of interest,
+    for one disability category at one version of its reviews
+    '''
+    id: str = Field(alias="_id")  # "<poi_id>|<category>|<review_version>"
+    poi_id: str
+    category: DisabilityCategory
+    review_version: int = 0
+    relevant_summary: str
+    relevant_review_excerpts: List[str] = []
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "poi_profiles"  # Collection name in MongoDB
+        # invalidate_place deletes a POI's profiles by poi_id on every review
+        indexes = [IndexModel([("poi_id", ASCENDING)])]
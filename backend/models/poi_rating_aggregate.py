@@ -0,0 +1,19 @@
+from beanie import Document
+from pydantic import BaseModel, Field
+from typing import Dict
+
+class CategoryRatingAggregate(BaseModel):
+    count: int = 0
+    sum: float = 0.0
+    histogram: Dict[str, int] = {}  # "1_star" .. "5_star" -> number of ratings
+
+class POIRatingAggregate(Document):
+    '''
+    running per-category rating totals for a point of interest,
+    kept current with $inc on every rating insert
+    '''
+    id: str = Field(alias="_id")  # poi_id
+    categories: Dict[str, CategoryRatingAggregate] = {}  # keyed by DisabilityCategory value
+
+    class Settings:
+        name = "poi_rating_aggregates"  # Collection name in MongoDB
@@ -1,13 +1,18 @@
 from beanie import Document
 from datetime import datetime, timezone
 from pydantic import Field
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from uuid import uuid4
 
 class Review(Document):
-    id: str = Field(alias="_id")
+    id: str = Field(default_factory=lambda: str(uuid4()), alias="_id")
     poi_id: str
     review_text: str
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
     class Settings:
-        name = "reviews"  # Collection name in MongoDB
\ No newline at end of file
+        name = "reviews"  # Collection name in MongoDB
+        # A POI's reviews, newest first: prompt selection and cursor pagination. _id is the
+        # cursor's tie-breaker, so the index covers the whole sort and pages never sort in memory
+        indexes = [IndexModel([("poi_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)])]
@@ -0,0 +1,20 @@
+from beanie import Document
+from pydantic import Field
+from typing import List
+
+class POIReviewEmbeddings(Document):
+    '''
+    embedded review sentences of a point of interest: one packed float16
+    matrix with a row per sentence, and the sentences' texts and review ids
+    in the same order
+    '''
+    id: str = Field(alias="_id")  # poi_id
+    model: str  # embedder that produced the vectors
+    dim: int
+    texts: List[str] = []
+    review_ids: List[str] = []
+    matrix: bytes = b""  # row-major float16, len(texts) x dim
+    revision: int = 0  # bumped on every write; concurrent writers retry on a mismatch
+
+    class Settings:
+        name = "poi_review_embeddings"  # Collection name in MongoDB
@@ -0,0 +1,86 @@
+"""
+Request-body parsing for the bulk endpoints.
+
+A bulk body is a JSON array, or NDJSON (one JSON object per line) when the
+Content-Type is application/x-ndjson. NDJSON is read as it streams in and
+written in chunks, so large uploads are never held in memory whole. Invalid
+items are skipped and reported; valid ones are written, and those MongoDB
+refuses are counted as failed.
+"""
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Tuple, Type, TypeVar
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+
+from dtos.bulk_dto import BulkRejectionDTO, BulkResultDTO
+from services.bulk_insert import BulkWriteCounts
+
+ItemT = TypeVar("ItemT", bound=BaseModel)
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+MAX_REPORTED_ERRORS = 100
+
+
+async def _ndjson_items(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    pending = b""
+    index = 0
+    async for data in request.stream():
+        pending += data
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield index, line
+            index += 1
+    yield index, pending
+
+
+async def _array_items(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    try:
+        items = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="body is not valid JSON")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="body must be a JSON array (or NDJSON)")
+    for index, item in enumerate(items):
+        yield index, item
+
+
+async def read_bulk(
+    request: Request,
+    model: Type[ItemT],
+    write: Callable[[List[ItemT]], Awaitable[BulkWriteCounts]],
+    chunk_size: int,
+) -> BulkResultDTO:
+    """Validate each item of the body as `model` and pass the valid ones to `write`, chunk_size at a time."""
+    ndjson = request.headers.get("content-type", "").split(";")[0].strip() in NDJSON_CONTENT_TYPES
+    items = _ndjson_items(request) if ndjson else _array_items(request)
+    result = BulkResultDTO()
+    chunk: List[ItemT] = []
+
+    async def flush() -> None:
+        counts = await write(chunk)
+        result.inserted += counts.inserted
+        result.failed += counts.failed
+
+    async for index, raw in items:
+        try:
+            if ndjson:
+                if not raw.strip():
+                    continue
+                chunk.append(model.model_validate_json(raw))
+            else:
+                chunk.append(model.model_validate(raw))
+        except ValidationError as e:
+            result.rejected += 1
+            if len(result.errors) < MAX_REPORTED_ERRORS:
+                detail = "; ".join(
+                    f"{'.'.join(map(str, err['loc'])) or 'item'}: {err['msg']}" for err in e.errors()
+                )
+                result.errors.append(BulkRejectionDTO(index=index, detail=detail))
+            continue
+        if len(chunk) >= chunk_size:
+            await flush()
+            chunk = []
+    if chunk:
+        await flush()
+    return result
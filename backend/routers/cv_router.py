@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import asyncio
-from typing import List, Optional
+import json
+import struct
+from typing import List, Optional, Tuple
 
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi import Depends
+from fastapi.responses import JSONResponse
 import contextlib
 
 from dtos.cv_dtos import (
@@ -14,11 +17,15 @@ from dtos.cv_dtos import (
     StopSessionResponse,
     LatestSummaryResponse,
 )
-from services.cv_service import get_cv_service, CVService, Summary
+from services.cv_service import get_cv_service, CVService
 from loguru import logger
 
 router = APIRouter(prefix="/cv", tags=["cv"])
 
+# Binary frame record on /cv/frames/ws: little-endian float64 timestamp,
+# uint32 JPEG length, then the JPEG bytes. A message may hold several records.
+FRAME_HEADER = struct.Struct("<dI")
+
 
 def get_service() -> CVService:
     return get_cv_service()
@@ -27,7 +34,10 @@ def get_service() -> CVService:
 @router.post("/session/start", response_model=StartSessionResponse)
 async def start_session(req: StartSessionRequest, svc: CVService = Depends(get_service)):
     # Optionally use req.sampling_rate / req.summary_interval_s to configure session
-    session_id = await svc.start_session(params=req.model_dump())
+    try:
+        session_id = await svc.start_session(params=req.model_dump())
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     logger.info(f"[CV] start_session -> {session_id} params={req.model_dump()} ")
     return StartSessionResponse(session_id=session_id)
 
@@ -49,7 +59,6 @@ async def upload_frames(
     # Parse timestamps if provided
     timestamps: Optional[List[float]] = None
     if timestamps_json:
-        import json
         try:
             timestamps = json.loads(timestamps_json)
             if not isinstance(timestamps, list):
@@ -64,17 +73,68 @@ async def upload_frames(
         data.append(content)
 
     try:
-        logger.info(f"[CV] /frames <- session={session_id} count={len(data)} sizes={[len(b) for b in data]}")
-        await svc.enqueue_frames(session_id, data, timestamps)
+        logger.debug(f"[CV] /frames <- session={session_id} count={len(data)}")
+        dropped = await svc.enqueue_frames(session_id, data, timestamps)
     except KeyError:
         raise HTTPException(status_code=404, detail="session not found")
 
-    return {"ok": True}
+    return {"ok": True, "dropped": dropped}
+
+
+def _parse_frame_records(buf: bytes) -> Tuple[List[memoryview], List[float]]:
+    # Slices of a memoryview share the websocket message buffer; nothing is copied
+    view = memoryview(buf)
+    frames: List[memoryview] = []
+    timestamps: List[float] = []
+    offset = 0
+    while offset < len(view):
+        if offset + FRAME_HEADER.size > len(view):
+            raise ValueError("truncated frame header")
+        ts, length = FRAME_HEADER.unpack_from(view, offset)
+        offset += FRAME_HEADER.size
+        if offset + length > len(view):
+            raise ValueError("truncated frame data")
+        frames.append(view[offset:offset + length])
+        timestamps.append(ts)
+        offset += length
+    return frames, timestamps
+
+
+@router.websocket("/frames/ws/{session_id}")
+async def frames_ws(ws: WebSocket, session_id: str):
+    await ws.accept()
+    svc = get_cv_service()
+    logger.info(f"[CV] frames WS connect session={session_id}")
+    try:
+        while True:
+            message = await ws.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            buf = message.get("bytes")
+            if buf is None:
+                # Frames are binary records; a text message is a protocol error, not a server failure
+                await ws.close(code=1003, reason="frames must be sent as binary messages")
+                return
+            try:
+                frames, timestamps = _parse_frame_records(buf)
+            except ValueError as e:
+                await ws.send_json({"type": "error", "detail": str(e)})
+                continue
+            if not frames:
+                continue
+            try:
+                await svc.enqueue_frames(session_id, frames, timestamps)
+            except KeyError:
+                await ws.send_json({"type": "error", "detail": "session not found"})
+                await ws.close(code=4404)
+                return
+    except WebSocketDisconnect:
+        logger.info(f"[CV] frames WS disconnect session={session_id}")
 
 
 @router.get("/summary/latest", response_model=LatestSummaryResponse)
 async def latest_summary(session_id: str, svc: CVService = Depends(get_service)):
-    summ = svc.get_latest_summary(session_id)
+    summ = await svc.get_latest_summary(session_id)
     if not summ:
         # Either no session or no summary yet. Check session existence first.
         # If session exists but none yet, return 204-like payload with session_id only
@@ -90,46 +150,43 @@ async def latest_summary(session_id: str, svc: CVService = Depends(get_service))
     )
 
 
+@router.get("/ready")
+async def ready(svc: CVService = Depends(get_service)):
+    # Readiness probe: 503 until models are loaded and warmed up
+    state = svc.readiness()
+    return JSONResponse(status_code=200 if state["status"] == "ready" else 503, content=state)
+
+
+@router.get("/metrics")
+async def metrics(svc: CVService = Depends(get_service)):
+    return svc.get_metrics()
+
+
 # WebSocket for push summaries
 @router.websocket("/summary/ws/{session_id}")
 async def summary_ws(ws: WebSocket, session_id: str):
     await ws.accept()
     svc = get_cv_service()
-    # Define a callback to push summaries
-    queue: asyncio.Queue[Summary] = asyncio.Queue()
-
-    def on_summary(s: Summary) -> None:
-        # push into queue for async send
-        try:
-            queue.put_nowait(s)
-        except Exception:
-            pass
-
     try:
         logger.info(f"[CV] WS connect session={session_id}")
-        svc.subscribe(session_id, on_summary)
+        sub = await svc.subscribe(session_id)
     except KeyError:
         await ws.send_json({"type": "error", "detail": "session not found"})
         await ws.close(code=4404)
         return
 
     try:
-        while True:
-            s = await queue.get()
-            payload = {
-                "type": "summary",
-                "session_id": session_id,
-                "ts": s.ts,
-                "version": s.version,
-                "text": s.text,
-                "audio_url": s.audio_url,
-                "extra": s.extra,
-            }
-            logger.info(f"[CV] WS -> session={session_id} v={s.version} text={(s.text or '')[:120]}")
-            await ws.send_json(payload)
+        # Latest-only: if sends fall behind, older summaries are skipped, never queued
+        while (payload := await sub.get()) is not None:
+            logger.debug(f"[CV] WS -> session={session_id} v={sub.version}")
+            await asyncio.wait_for(ws.send_text(payload), timeout=svc.SUBSCRIBER_MAX_LAG_S)
+    except asyncio.TimeoutError:
+        sub.close("slow_consumer")
     except WebSocketDisconnect:
         logger.info(f"[CV] WS disconnect session={session_id}")
     finally:
-        svc.unsubscribe(session_id, on_summary)
+        if sub.close_reason == "slow_consumer":
+            logger.warning(f"[CV] WS slow consumer dropped session={session_id}")
+        svc.unsubscribe(session_id, sub)
         with contextlib.suppress(Exception):
-            await ws.close()
+            await ws.close(code=4408 if sub.close_reason == "slow_consumer" else 1000)
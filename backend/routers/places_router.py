@@ -1,25 +1,103 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from services.places_service import get_places_service
 from dtos.poi_full_dto import POI_FULL_DTO
 from dtos.poi_partial_dto import POI_PARTIAL_DTO
 from models.user_preferences import UserPreferences
-from typing import List
+from typing import Any, Dict, List, Optional
+from loguru import logger
+import json
 
 router = APIRouter(prefix="/places", tags=["places"])
 
 
+# Fixed paths are declared before /{place_id} so they are not taken for a place id
+@router.get("/nearby", response_model=List[POI_PARTIAL_DTO])
+async def get_nearby_places(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_m: float = Query(1000, gt=0, le=50_000),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    user_preferences: Optional[UserPreferences] = None,
+):
+    """Places within radius_m meters of a point, closest and most accessible for the user first"""
+
+    places_service = get_places_service()
+    return await places_service.get_places_nearby(lat, lon, radius_m, limit, offset, user_preferences)
+
+
+@router.get("/within", response_model=List[POI_PARTIAL_DTO])
+async def get_places_in_viewport(
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+    limit: int = Query(200, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    user_preferences: Optional[UserPreferences] = None,
+):
+    """Places inside a map viewport (bounding box)"""
+
+    places_service = get_places_service()
+    try:
+        return await places_service.get_places_within(
+            min_lat, min_lon, max_lat, max_lon, limit, offset, user_preferences
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/search", response_model=List[POI_PARTIAL_DTO])
+async def get_partial_places(
+    query: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    user_preferences: Optional[UserPreferences] = None,
+):
+    """Places whose name or categories match the query, for autocomplete; lat/lon favour nearby matches"""
+
+    places_service = get_places_service()
+    return await places_service.search_places(query, limit, user_preferences, lat, lon)
+
 
 @router.get("/{place_id}", response_model=POI_FULL_DTO)
 async def get_full_place(place_id: str, user_preferences: UserPreferences):
     """Get a specific place"""
 
     places_service = get_places_service()
-    place = await places_service.get_place_by_id(place_id, user_preferences)
-    return {"poi_data": place}
+    try:
+        return await places_service.get_place_by_id(place_id, user_preferences)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="place not found")
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.get("/{place_id}/stream")
+async def stream_full_place(place_id: str, user_preferences: UserPreferences):
+    """Get a specific place as server-sent events: basics first, then the summary as it is generated"""
+
+    places_service = get_places_service()
+    events = places_service.stream_place_by_id(place_id, user_preferences)
+    try:
+        first = await anext(events)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="place not found")
+
+    async def event_stream():
+        yield _sse(*first)
+        try:
+            async for event, data in events:
+                yield _sse(event, data)
+        except Exception as e:
+            logger.warning(f"Streaming place {place_id} failed: {e!r}")
+            yield _sse("error", {"detail": "summary generation failed"})
 
-@router.get("/search?query={query}", response_model=List[POI_PARTIAL_DTO])
-async def get_partial_places(query: str):
-    return []
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 
 @router.post("/")
@@ -1,7 +1,10 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from typing import List
 from services.ratings_service import get_ratings_service
+from dtos.bulk_dto import BulkResultDTO
 from dtos.poi_rating_dto import POIRatingDTO
 from models.poi_ratings import POIRating
+from routers.bulk_upload import read_bulk
 
 router = APIRouter(prefix="/ratings", tags=["ratings"])
 
@@ -14,4 +17,16 @@ async def create_rating(rating_data: POIRatingDTO):
     ratings_service = get_ratings_service()
     rating = await ratings_service.create_rating(rating)
 
-    return {'error': False}
\ No newline at end of file
+    return {'error': False}
+
+
+@router.post("/bulk", response_model=BulkResultDTO)
+async def create_ratings(request: Request):
+    """Create many ratings from a JSON array of ratings, or NDJSON (Content-Type: application/x-ndjson)"""
+
+    ratings_service = get_ratings_service()
+
+    async def write(chunk: List[POIRatingDTO]):
+        return await ratings_service.create_ratings([POIRating(**dto.model_dump()) for dto in chunk])
+
+    return await read_bulk(request, POIRatingDTO, write, ratings_service.bulk_chunk_size)
@@ -1,6 +1,9 @@
-from fastapi import APIRouter
-from dtos.review_dto import ReviewDTO
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import List, Optional
+from dtos.bulk_dto import BulkResultDTO
+from dtos.review_dto import ReviewDTO, ReviewPageDTO
 from models.review import Review
+from routers.bulk_upload import read_bulk
 from services.reviews_service import get_reviews_service
 
 router = APIRouter(prefix="/reviews", tags=["reviews"])
@@ -13,4 +16,32 @@ async def create_review(review_data: ReviewDTO):
     review = Review(**review_data.model_dump())
     reviews_service = get_reviews_service()
     review = await reviews_service.create_review(review)
-    return {'error': False}
\ No newline at end of file
+    return {'error': False}
+
+
+@router.post("/bulk", response_model=BulkResultDTO)
+async def create_reviews(request: Request):
+    """Create many reviews from a JSON array of reviews, or NDJSON (Content-Type: application/x-ndjson)"""
+
+    reviews_service = get_reviews_service()
+
+    async def write(chunk: List[ReviewDTO]):
+        return await reviews_service.create_reviews([Review(**dto.model_dump()) for dto in chunk])
+
+    return await read_bulk(request, ReviewDTO, write, reviews_service.bulk_chunk_size)
+
+
+@router.get("/", response_model=ReviewPageDTO)
+async def list_reviews(
+    poi_id: str,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+):
+    """A page of a place's reviews, newest first"""
+
+    reviews_service = get_reviews_service()
+    try:
+        reviews, next_cursor = await reviews_service.list_reviews(poi_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return ReviewPageDTO(reviews=reviews, next_cursor=next_cursor)
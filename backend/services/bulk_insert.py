@@ -0,0 +1,37 @@
+"""
+Unordered bulk inserts that report which documents were written.
+
+With ordered=False MongoDB keeps going past a failed document (a duplicate
+_id, a validation error) and raises BulkWriteError at the end. Everything
+not listed in its writeErrors was written, and the follow-up work
+(aggregates, embeddings, invalidation) must still run for those.
+"""
+from __future__ import annotations
+
+from typing import List, NamedTuple, Tuple, Type, TypeVar
+
+from beanie import Document
+from loguru import logger
+from pymongo.errors import BulkWriteError
+
+DocumentT = TypeVar("DocumentT", bound=Document)
+
+
+class BulkWriteCounts(NamedTuple):
+    inserted: int = 0
+    failed: int = 0
+
+
+async def insert_unordered(model: Type[DocumentT], documents: List[DocumentT]) -> Tuple[List[DocumentT], int]:
+    """insert_many(ordered=False); the documents that were written and how many were not."""
+    try:
+        await model.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        failed = {error["index"] for error in errors}
+        if errors:
+            logger.warning(
+                f"{len(failed)} of {len(documents)} {model.__name__} inserts failed, first: {errors[0].get('errmsg')}"
+            )
+        return [d for i, d in enumerate(documents) if i not in failed], len(failed)
+    return documents, 0
@@ -1,22 +1,37 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import time
 import uuid
-from dataclasses import dataclass, field
-from typing import Dict, Optional, List, Any, Set, Callable
+from dataclasses import dataclass, field, replace
+from typing import Dict, Optional, List, Any, Set, Callable, Sequence, Union
 
 import os
 import contextlib
 import tempfile
+import threading
+import multiprocessing as mp
+import ast
+from collections import OrderedDict, deque
+from pathlib import Path
+from multiprocessing.shared_memory import SharedMemory
+from types import SimpleNamespace
 
 import numpy as np
-import cv2
 from dotenv import load_dotenv
-from ultralytics import YOLO
-from google import genai
 from loguru import logger
 
+# cv2, ultralytics and google.genai are imported where used: they cost
+# seconds at import time and non-CV endpoints should not pay for them
+
+from services.scene_narration import narrate, is_urgent
+from services.cv_shards import ShardRouter
+
+
+# Encoded JPEG frame; memoryviews let the websocket ingest path avoid copies
+FrameBytes = Union[bytes, memoryview]
+
 
 @dataclass
 class Summary:
@@ -27,52 +42,1172 @@ class Summary:
     extra: Dict[str, Any] = field(default_factory=dict)
 
 
+def _percentiles(values: Any) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"p50": None, "p95": None, "p99": None}
+    p50, p95, p99 = np.percentile(np.fromiter(values, dtype=np.float64), [50, 95, 99])
+    return {"p50": float(p50), "p95": float(p95), "p99": float(p99)}
+
+
+POSITIONS = ("left", "center", "right")
+DISTANCES = ("very_close", "near", "far")
+
+
+class SceneState:
+    """
+    Array-backed per-session scene: one slot per tracked object, keyed by
+    (class id, track id), holding stable position/distance codes, the
+    hysteresis candidate and its streak length, and when it was last seen.
+    """
+
+    _ARRAYS = (
+        "cls", "tid", "pos", "pos_cand", "pos_cnt", "dist", "dist_cand", "dist_cnt",
+        "active", "seen_tick", "seen_ts",
+    )
+    __slots__ = ("slot_of", "free", "tick") + _ARRAYS
+
+    def __init__(self, capacity: int = 64) -> None:
+        self.slot_of: Dict[tuple, int] = {}
+        self.free: List[int] = list(range(capacity - 1, -1, -1))
+        # Number of scene updates so far; "frames missed" counts processed frames only
+        self.tick = 0
+        self.cls = np.zeros(capacity, dtype=np.int32)
+        self.tid = np.zeros(capacity, dtype=np.int64)
+        self.pos = np.zeros(capacity, dtype=np.int8)
+        self.pos_cand = np.full(capacity, -1, dtype=np.int8)
+        self.pos_cnt = np.zeros(capacity, dtype=np.int16)
+        self.dist = np.zeros(capacity, dtype=np.int8)
+        self.dist_cand = np.full(capacity, -1, dtype=np.int8)
+        self.dist_cnt = np.zeros(capacity, dtype=np.int16)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.seen_tick = np.zeros(capacity, dtype=np.int64)
+        self.seen_ts = np.zeros(capacity, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.slot_of)
+
+    def _grow(self) -> None:
+        old = len(self.cls)
+        for name in self._ARRAYS:
+            arr = getattr(self, name)
+            grown = np.full(old * 2, -1 if name.endswith("_cand") else 0, dtype=arr.dtype)
+            grown[:old] = arr
+            setattr(self, name, grown)
+        self.free.extend(range(old * 2 - 1, old - 1, -1))
+
+    def add(self, key: tuple, pos: int, dist: int) -> int:
+        if not self.free:
+            self._grow()
+        slot = self.free.pop()
+        self.slot_of[key] = slot
+        self.cls[slot], self.tid[slot] = key
+        self.pos[slot], self.dist[slot] = pos, dist
+        self.pos_cand[slot] = self.dist_cand[slot] = -1
+        self.pos_cnt[slot] = self.dist_cnt[slot] = 0
+        self.active[slot] = True
+        return slot
+
+    def remove(self, slot: int) -> None:
+        del self.slot_of[(int(self.cls[slot]), int(self.tid[slot]))]
+        self.active[slot] = False
+        self.free.append(slot)
+
+
+class MotionGate:
+    """
+    Per-session inference gate driven by a cheap scene-change signal: the
+    mean absolute difference between a tiny grayscale thumbnail of the
+    current frame and that of the last frame sent to inference. While the
+    scene stays static the inference interval doubles up to max_interval;
+    motion (or a forced frame) drops it back to every frame.
+    """
+
+    __slots__ = ("prev", "interval", "since_infer", "skipped")
+
+    THUMB_SIZE = (32, 24)
+
+    def __init__(self) -> None:
+        self.prev: Optional[np.ndarray] = None
+        self.interval = 1
+        self.since_infer = 0
+        self.skipped = 0
+
+    @classmethod
+    def thumbnail(cls, frame: np.ndarray) -> np.ndarray:
+        import cv2
+
+        return cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), cls.THUMB_SIZE, interpolation=cv2.INTER_AREA)
+
+    @classmethod
+    def thumbnail_from_jpeg(cls, buf: FrameBytes) -> Optional[np.ndarray]:
+        import cv2
+
+        # libjpeg decodes at 1/8 scale straight to grayscale: a small fraction of a full decode
+        small = cv2.imdecode(np.frombuffer(buf, dtype=np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+        if small is None:
+            return None
+        return cv2.resize(small, cls.THUMB_SIZE, interpolation=cv2.INTER_AREA)
+
+    def should_infer(self, thumb: np.ndarray, threshold: float, max_interval: int, force: bool = False) -> bool:
+        import cv2
+
+        moving = force or self.prev is None or float(np.mean(cv2.absdiff(thumb, self.prev))) >= threshold
+        self.since_infer += 1
+        if moving:
+            self.interval = 1
+        if self.since_infer < self.interval:
+            self.skipped += 1
+            return False
+        if not moving:
+            self.interval = min(self.interval * 2, max(1, max_interval))
+        self.since_infer = 0
+        self.prev = thumb
+        return True
+
+
+def _hysteresis(
+    stable: np.ndarray, cand: np.ndarray, cnt: np.ndarray, slots: np.ndarray, new: np.ndarray, threshold: int
+) -> np.ndarray:
+    """
+    Vectorized hysteresis over the given slots: a new value must be observed
+    `threshold` times in a row before it replaces the stable one. Updates the
+    arrays in place and returns a mask of slots whose stable value changed.
+    """
+    same = new == stable[slots]
+    streak = np.where(cand[slots] == new, cnt[slots] + 1, 1)
+    changed = ~same & (streak >= threshold)
+    pending = ~same & ~changed
+    stable[slots] = np.where(changed, new, stable[slots])
+    cand[slots] = np.where(pending, new, -1)
+    cnt[slots] = np.where(pending, streak, 0)
+    return changed
+
+
+# Backpressure policies for a session's frame queue:
+# - "bounded": keep up to queue_maxsize payloads, reject incoming frames when full
+# - "drop_oldest": keep up to queue_maxsize payloads, discard the oldest when full
+# - "latest": coalesce everything pending into the single newest frame
+QUEUE_POLICIES = ("bounded", "drop_oldest", "latest")
+
+
+class SummarySubscription:
+    """
+    One subscriber's latest-only slot. Publishing overwrites a payload the
+    subscriber has not taken yet, so a slow connection only ever receives the
+    newest summary and nothing piles up behind it.
+    """
+
+    __slots__ = ("payload", "version", "pending_since", "superseded", "close_reason", "_event")
+
+    def __init__(self) -> None:
+        self.payload: Optional[str] = None
+        self.version = 0
+        self.pending_since = 0.0
+        self.superseded = 0
+        self.close_reason: Optional[str] = None
+        self._event = asyncio.Event()
+
+    @property
+    def closed(self) -> bool:
+        return self.close_reason is not None
+
+    def lag_s(self) -> float:
+        """How long the pending payload has waited to be taken (0 when the slot is empty)."""
+        return time.monotonic() - self.pending_since if self.payload is not None else 0.0
+
+    def offer(self, version: int, payload: str) -> bool:
+        """Fill the slot; returns False when this overwrote a payload that was never sent."""
+        if self.closed:
+            return True
+        fresh = self.payload is None
+        if fresh:
+            self.pending_since = time.monotonic()
+        else:
+            self.superseded += 1
+        self.payload, self.version = payload, version
+        self._event.set()
+        return fresh
+
+    def close(self, reason: str) -> None:
+        if self.close_reason is None:
+            self.close_reason = reason
+            self._event.set()
+
+    async def get(self) -> Optional[str]:
+        """Wait for the next payload; None once the subscription is closed."""
+        while self.payload is None and not self.closed:
+            self._event.clear()
+            await self._event.wait()
+        if self.closed:
+            return None
+        payload, self.payload = self.payload, None
+        return payload
+
+
 @dataclass
 class SessionState:
     session_id: str
     queue: "asyncio.Queue[dict]" = field(default_factory=asyncio.Queue)
+    queue_policy: str = "latest"
     task: Optional[asyncio.Task] = None
     latest_summary: Optional[Summary] = None
+    summary_version: int = 0
+    # Summarization runs in its own task so frame processing never waits on the LLM
+    summary_task: Optional[asyncio.Task] = None
+    summary_interval_s: float = 3.0
+    last_summary_start: float = 0.0
+    events_ready: asyncio.Event = field(default_factory=asyncio.Event)
     last_activity_ts: float = field(default_factory=lambda: time.time())
-    # For WebSocket subscribers (managed by router)
-    subscribers: Set[Callable[[Summary], None]] = field(default_factory=set)
+    # Summary WebSocket subscribers (managed by router)
+    subscribers: Set[SummarySubscription] = field(default_factory=set)
+    subscribers_dropped: int = 0
+    summaries_superseded: int = 0
     # Per-session scene state
-    scene_objects: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    scene: "SceneState" = field(default_factory=lambda: SceneState())
     event_buffer: List[Any] = field(default_factory=list)
     # Fingerprint of last emitted events to avoid duplicate summaries
     last_events_fingerprint: Optional[str] = None
     frame_idx: int = 0
+    # Per-session tracker so track IDs never leak between sessions sharing a model
+    # (lives in the pinned worker process when running with CV_WORKERS > 0)
+    tracker: Any = None
+    worker: int = 0
+    # Adaptive frame skipping; process_every_n is the fixed stride on top of it
+    gate: MotionGate = field(default_factory=MotionGate)
+    process_every_n: int = 1
+    # Backpressure accounting
+    frames_received: int = 0
+    frames_dropped: int = 0
+    payload_errors: int = 0
+    # Receive-to-scene-update latency of processed frames (ms)
+    frame_ages_ms: deque = field(default_factory=lambda: deque(maxlen=256))
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "queue_policy": self.queue_policy,
+            "queue_depth": self.queue.qsize(),
+            "frames_received": self.frames_received,
+            "frames_dropped": self.frames_dropped,
+            "payload_errors": self.payload_errors,
+            "frames_skipped": self.gate.skipped,
+            "inference_interval": self.gate.interval,
+            "scene_objects": len(self.scene),
+            "frame_age_ms": _percentiles(self.frame_ages_ms),
+            "subscribers": len(self.subscribers),
+            "subscribers_dropped": self.subscribers_dropped,
+            "summaries_superseded": self.summaries_superseded,
+        }
+
+
+@dataclass
+class FrameJob:
+    session: SessionState
+    # Decoded pixels in-process; the JPEG itself in pool mode, decoded by the worker
+    frame: Union[np.ndarray, FrameBytes]
+    future: "asyncio.Future[tuple]"
+    enqueued_ts: float = field(default_factory=time.perf_counter)
+
+
+class SummaryCache:
+    """
+    LRU + TTL cache of LLM scene summaries keyed by a canonical event set:
+    track IDs are stripped and events sorted, so sessions seeing the same
+    kinds of changes share one summary.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_s: float = 300.0) -> None:
+        self.max_size = max(0, max_size)
+        self.ttl_s = ttl_s
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def canonical_key(events: List[Any]) -> tuple:
+        return tuple(
+            sorted((kind, d.get("type"), d.get("position"), d.get("distance")) for kind, d in events)
+        )
+
+    def get(self, key: tuple) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        stored_at, text = entry
+        if time.monotonic() - stored_at > self.ttl_s:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return text
+
+    def put(self, key: tuple, text: str) -> None:
+        if self.max_size == 0:
+            return
+        self._entries[key] = (time.monotonic(), text)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_s": self.ttl_s,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+# ultralytics' bytetrack.yaml defaults. model.track defaulted to BoT-SORT
+# (botsort.yaml); tracking now runs ByteTrack per session instead
+BYTETRACK_CFG: Dict[str, Any] = {
+    "tracker_type": "bytetrack",
+    "track_high_thresh": 0.25,
+    "track_low_thresh": 0.1,
+    "new_track_thresh": 0.25,
+    "track_buffer": 30,
+    "match_thresh": 0.8,
+    "fuse_score": True,
+}
+
+
+# COCO class ids the service tracks
+TRACKED_CLASSES = (0, 15, 16, 1, 2, 3, 5, 6, 7, 8, 9, 11, 12, 13, 56, 57, 59, 60, 61, 71, 72, 62, 74)
+INFERENCE_BACKENDS = ("ultralytics", "onnxruntime", "openvino")
+TRACKERS = ("bytetrack", "iou")
+
+
+@dataclass
+class BackendSpec:
+    """Everything needed to build a detector, picklable for worker processes."""
+
+    kind: str = "ultralytics"
+    model_path: str = "yolov8n.pt"
+    device: str = "cpu"
+    classes: List[int] = field(default_factory=list)
+    conf: float = 0.5
+    iou: float = 0.7
+    imgsz: int = 640
+    int8: bool = False
+    tracker: str = "bytetrack"
+
+
+class DetectionBoxes:
+    """
+    (N, 6) [x1, y1, x2, y2, conf, cls] detections exposing the Boxes-like
+    attributes trackers read, with boolean/index slicing.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: np.ndarray) -> None:
+        self.data = data
+
+    @property
+    def xyxy(self) -> np.ndarray:
+        return self.data[:, :4]
+
+    @property
+    def xywh(self) -> np.ndarray:
+        xyxy = self.data[:, :4]
+        return np.concatenate([(xyxy[:, :2] + xyxy[:, 2:]) / 2, xyxy[:, 2:] - xyxy[:, :2]], axis=1)
+
+    @property
+    def conf(self) -> np.ndarray:
+        return self.data[:, 4]
+
+    @property
+    def cls(self) -> np.ndarray:
+        return self.data[:, 5]
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, idx: Any) -> "DetectionBoxes":
+        return DetectionBoxes(self.data[idx])
+
+
+class InferenceBackend:
+    """Detector interface: a batch of BGR frames in, one (N, 6) [x1, y1, x2, y2, conf, cls] array per frame out."""
+
+    names: Dict[int, str] = {}
+
+    def detect(self, frames: List[np.ndarray]) -> List[np.ndarray]:
+        raise NotImplementedError
+
+
+class UltralyticsBackend(InferenceBackend):
+    """PyTorch model through ultralytics' predictor (the original path)."""
+
+    def __init__(self, model: Any, classes: List[int], conf: float = 0.5, imgsz: int = 640) -> None:
+        self.model = model
+        self.names = dict(model.names)
+        self.classes = classes
+        self.conf = conf
+        self.imgsz = imgsz
+
+    def detect(self, frames: List[np.ndarray]) -> List[np.ndarray]:
+        results = self.model.predict(frames, classes=self.classes, conf=self.conf, imgsz=self.imgsz, verbose=False)
+        out: List[np.ndarray] = []
+        for r in results:
+            b = r.boxes.cpu().numpy()
+            out.append(np.column_stack([b.xyxy, b.conf, b.cls]).astype(np.float32, copy=False))
+        return out
+
+
+class ExportedYoloBackend(InferenceBackend):
+    """
+    Shared pre/post-processing for YOLO models exported by ultralytics:
+    letterbox to a fixed square, one NCHW blob per batch, then confidence /
+    class filtering and per-class NMS in NumPy/OpenCV.
+    """
+
+    def __init__(
+        self, names: Dict[int, str], classes: List[int], conf: float, iou: float, imgsz: int, end2end: bool = False
+    ) -> None:
+        self.names = names
+        self.conf = conf
+        self.iou = iou
+        self.imgsz = imgsz
+        self.end2end = end2end
+        self.max_det = 300
+        self._class_ok = np.zeros(max(names) + 1, dtype=bool)
+        self._class_ok[[c for c in classes if c < len(self._class_ok)] or slice(None)] = True
+
+    def _run(self, blob: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def _letterbox(self, frame: np.ndarray) -> tuple:
+        import cv2
+
+        h, w = frame.shape[:2]
+        r = min(self.imgsz / h, self.imgsz / w)
+        nh, nw = int(round(h * r)), int(round(w * r))
+        top, left = (self.imgsz - nh) // 2, (self.imgsz - nw) // 2
+        canvas = np.full((self.imgsz, self.imgsz, 3), 114, dtype=np.uint8)
+        canvas[top:top + nh, left:left + nw] = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+        return canvas, r, left, top
+
+    def _decode(self, pred: np.ndarray) -> np.ndarray:
+        import cv2
+
+        if self.end2end:
+            # Already NMS-ed: (max_det, 6) [x1, y1, x2, y2, conf, cls]
+            cls = pred[:, 5].astype(np.int64)
+            keep = (pred[:, 4] >= self.conf) & self._class_ok[np.clip(cls, 0, len(self._class_ok) - 1)]
+            return pred[keep]
+        # (4 + nc, anchors) -> per-anchor xywh + class scores
+        p = pred.T
+        scores = p[:, 4:]
+        cls = scores.argmax(axis=1)
+        conf = scores[np.arange(len(cls)), cls]
+        keep = (conf >= self.conf) & self._class_ok[cls]
+        if not keep.any():
+            return np.zeros((0, 6), dtype=np.float32)
+        xywh, conf, cls = p[keep, :4], conf[keep], cls[keep]
+        tl = xywh[:, :2] - xywh[:, 2:] / 2
+        idx = cv2.dnn.NMSBoxesBatched(
+            np.concatenate([tl, xywh[:, 2:]], axis=1).tolist(), conf.tolist(), cls.tolist(), self.conf, self.iou
+        )
+        idx = np.asarray(idx, dtype=np.int64).reshape(-1)[: self.max_det]
+        xyxy = np.concatenate([tl[idx], tl[idx] + xywh[idx, 2:]], axis=1)
+        return np.column_stack([xyxy, conf[idx], cls[idx]]).astype(np.float32)
+
+    def detect(self, frames: List[np.ndarray]) -> List[np.ndarray]:
+        import cv2
+
+        boxed = [self._letterbox(f) for f in frames]
+        blob = cv2.dnn.blobFromImages([b[0] for b in boxed], 1.0 / 255.0, swapRB=True)
+        preds = self._run(blob)
+        out: List[np.ndarray] = []
+        for frame, (_, r, left, top), pred in zip(frames, boxed, preds):
+            det = self._decode(pred)
+            if len(det):
+                # Undo the letterbox back to original pixels
+                det[:, [0, 2]] = ((det[:, [0, 2]] - left) / r).clip(0, frame.shape[1])
+                det[:, [1, 3]] = ((det[:, [1, 3]] - top) / r).clip(0, frame.shape[0])
+            out.append(det)
+        return out
+
+
+class OnnxRuntimeBackend(ExportedYoloBackend):
+    def __init__(self, path: str, classes: List[int], conf: float = 0.5, iou: float = 0.7, imgsz: int = 640) -> None:
+        import onnxruntime as ort
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if os.getenv("ORT_INTRA_OP_THREADS"):
+            opts.intra_op_num_threads = int(os.getenv("ORT_INTRA_OP_THREADS", "0"))
+        self.session = ort.InferenceSession(path, opts, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        meta = self.session.get_modelmeta().custom_metadata_map
+        super().__init__(
+            ast.literal_eval(meta["names"]), classes, conf, iou, imgsz, end2end=meta.get("end2end") == "True"
+        )
+
+    def _run(self, blob: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: blob})[0]
+
+
+class OpenVinoBackend(ExportedYoloBackend):
+    def __init__(self, path: str, classes: List[int], conf: float = 0.5, iou: float = 0.7, imgsz: int = 640) -> None:
+        import openvino as ov
+        import yaml
+
+        model_dir = Path(path)
+        meta = yaml.safe_load((model_dir / "metadata.yaml").read_text())
+        core = ov.Core()
+        self.compiled = core.compile_model(
+            core.read_model(next(model_dir.glob("*.xml"))), "CPU", {"PERFORMANCE_HINT": "LATENCY"}
+        )
+        self.output = self.compiled.output(0)
+        super().__init__(
+            {int(k): v for k, v in meta["names"].items()}, classes, conf, iou, imgsz,
+            end2end=bool(meta.get("end2end", False)),
+        )
+
+    def _run(self, blob: np.ndarray) -> np.ndarray:
+        return self.compiled(blob)[self.output]
+
+
+def _exported_model(model_path: str, fmt: str, imgsz: int, int8: bool = False) -> str:
+    """Path of the ONNX file / OpenVINO dir for model_path, exporting it from the .pt once if missing."""
+    src = Path(model_path)
+    if fmt == "onnx" and src.suffix == ".onnx":
+        return str(src)
+    if fmt == "openvino" and src.is_dir():
+        return str(src)
+    target = src.with_suffix(".onnx") if fmt == "onnx" else src.with_name(
+        f"{src.stem}{'_int8' if int8 else ''}_openvino_model"
+    )
+    if target.exists():
+        return str(target)
+    from ultralytics import YOLO
+
+    logger.info(f"Exporting {model_path} to {fmt}{' (int8)' if int8 else ''}...")
+    # dynamic batch so the scheduler can send any batch size
+    return str(YOLO(model_path).export(format=fmt, imgsz=imgsz, dynamic=True, int8=int8))
+
+
+def export_model(spec: BackendSpec) -> BackendSpec:
+    """
+    spec with model_path pointing at the exported model its backend loads,
+    exporting it first if needed. Worker processes are given the result so
+    they only load the model and never race each other exporting it.
+    """
+    if spec.kind == "onnxruntime":
+        return replace(spec, model_path=_exported_model(spec.model_path, "onnx", spec.imgsz))
+    if spec.kind == "openvino":
+        return replace(spec, model_path=_exported_model(spec.model_path, "openvino", spec.imgsz, spec.int8))
+    return spec
+
+
+def create_backend(spec: BackendSpec) -> InferenceBackend:
+    if spec.kind == "ultralytics":
+        from ultralytics import YOLO
+
+        return UltralyticsBackend(YOLO(spec.model_path).to(spec.device), spec.classes, spec.conf, spec.imgsz)
+    if spec.kind == "onnxruntime":
+        path = _exported_model(spec.model_path, "onnx", spec.imgsz)
+        return OnnxRuntimeBackend(path, spec.classes, spec.conf, spec.iou, spec.imgsz)
+    if spec.kind == "openvino":
+        path = _exported_model(spec.model_path, "openvino", spec.imgsz, spec.int8)
+        return OpenVinoBackend(path, spec.classes, spec.conf, spec.iou, spec.imgsz)
+    raise ValueError(f"CV_BACKEND must be one of {INFERENCE_BACKENDS}")
+
+
+def _box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    tl = np.maximum(a[:, None, :2], b[None, :, :2])
+    br = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.prod(np.clip(br - tl, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+class IoUTracker:
+    """
+    Lightweight tracker with no ultralytics/torch dependency: greedily
+    matches detections to live tracks of the same class by IoU and keeps
+    unmatched tracks alive for max_age frames. Same update() contract as
+    BYTETracker: rows of [x1, y1, x2, y2, track_id, score, cls, idx].
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, max_age: int = 30) -> None:
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.boxes = np.zeros((0, 4), dtype=np.float32)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.cls = np.zeros(0, dtype=np.int64)
+        self.age = np.zeros(0, dtype=np.int64)
+        self._next_id = 1
+
+    def update(self, dets: Any, img: Optional[np.ndarray] = None) -> np.ndarray:
+        xyxy = np.asarray(dets.xyxy, dtype=np.float32)
+        conf = np.asarray(dets.conf, dtype=np.float32)
+        cls = np.asarray(dets.cls).astype(np.int64)
+        n = len(conf)
+        det_track = np.full(n, -1, dtype=np.int64)
+        if len(self.ids) and n:
+            iou = _box_iou(self.boxes, xyxy)
+            iou[self.cls[:, None] != cls[None, :]] = 0.0
+            while True:
+                t, d = np.unravel_index(np.argmax(iou), iou.shape)
+                if iou[t, d] < self.iou_threshold:
+                    break
+                det_track[d] = t
+                iou[t, :] = 0.0
+                iou[:, d] = 0.0
+        matched = det_track >= 0
+        self.age += 1
+        self.boxes[det_track[matched]] = xyxy[matched]
+        self.age[det_track[matched]] = 0
+        new = np.flatnonzero(~matched)
+        new_ids = np.arange(self._next_id, self._next_id + len(new))
+        self._next_id += len(new)
+        ids = np.empty(n, dtype=np.int64)
+        ids[matched] = self.ids[det_track[matched]]
+        ids[new] = new_ids
+        alive = self.age <= self.max_age
+        self.boxes = np.concatenate([self.boxes[alive], xyxy[new]])
+        self.ids = np.concatenate([self.ids[alive], new_ids])
+        self.cls = np.concatenate([self.cls[alive], cls[new]])
+        self.age = np.concatenate([self.age[alive], np.zeros(len(new), dtype=np.int64)])
+        return np.column_stack([xyxy, ids, conf, cls, np.arange(n)]).astype(np.float32)
+
+
+def _new_tracker(kind: str = "bytetrack") -> Any:
+    if kind == "iou":
+        return IoUTracker(max_age=BYTETRACK_CFG["track_buffer"])
+    from ultralytics.trackers.byte_tracker import BYTETracker
+
+    return BYTETracker(SimpleNamespace(**BYTETRACK_CFG))
+
+
+def _predict_and_track(
+    backend: InferenceBackend, frames: List[np.ndarray], trackers: List[Any]
+) -> List[tuple]:
+    # One detector call for the batch, then tracking in submission order so
+    # each session's tracker sees its frames in sequence; (tracks, frame shape) per frame
+    return [
+        (tracker.update(DetectionBoxes(det), frame), frame.shape)
+        for frame, tracker, det in zip(frames, trackers, backend.detect(frames))
+    ]
+
+
+def _parse_sizes(value: str) -> List[tuple]:
+    # "640x480,1280x720" -> [(640, 480), (1280, 720)]
+    sizes = []
+    for item in value.split(","):
+        if item.strip():
+            w, h = item.lower().split("x")
+            sizes.append((int(w), int(h)))
+    return sizes
+
+
+def _warmup(backend: InferenceBackend, sizes: List[tuple], batch_sizes: List[int]) -> None:
+    """Run dummy frames through the detector so the first real frame does not pay for lazy init."""
+    for w, h in sizes:
+        for bs in batch_sizes:
+            backend.detect([np.zeros((h, w, 3), dtype=np.uint8)] * bs)
+
+
+class InferenceScheduler:
+    """
+    Collects frames submitted by all session workers and runs them through
+    the detector as one batch, then updates each session's own tracker.
+
+    A batch is dispatched when it reaches max_batch_size or when the oldest
+    pending frame has waited max_wait_ms, whichever comes first. Each
+    scheduler has one batch in flight; a limiter shared between schedulers
+    caps how many run at once across model instances.
+    """
+
+    def __init__(
+        self,
+        infer_batch: Callable[[List[FrameJob]], List[tuple]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        stats_window: int = 512,
+        limiter: Optional[asyncio.Semaphore] = None,
+    ) -> None:
+        self._infer_batch = infer_batch
+        self._limiter = limiter
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_s = max(0.0, max_wait_ms) / 1000.0
+        self._pending: "asyncio.Queue[FrameJob]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        # Rolling windows for tuning under load
+        self._batch_sizes: deque = deque(maxlen=stats_window)
+        self._queue_waits_ms: deque = deque(maxlen=stats_window)
+        self._batch_latencies_ms: deque = deque(maxlen=stats_window)
+        self._batches_total = 0
+        self._frames_total = 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        while not self._pending.empty():
+            job = self._pending.get_nowait()
+            if not job.future.done():
+                job.future.cancel()
+
+    def submit(self, st: SessionState, frame: Union[np.ndarray, FrameBytes]) -> "asyncio.Future[tuple]":
+        fut: "asyncio.Future[tuple]" = asyncio.get_running_loop().create_future()
+        self._pending.put_nowait(FrameJob(session=st, frame=frame, future=fut))
+        return fut
+
+    async def _collect(self) -> List[FrameJob]:
+        batch = [await self._pending.get()]
+        deadline = batch[0].enqueued_ts + self.max_wait_s
+        while len(batch) < self.max_batch_size:
+            if not self._pending.empty():
+                batch.append(self._pending.get_nowait())
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._pending.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            # Sessions cancelled while waiting should not cost inference time
+            batch = [job for job in batch if not job.future.done()]
+            if not batch:
+                continue
+            async with self._limiter or contextlib.nullcontext():
+                started = time.perf_counter()
+                for job in batch:
+                    self._queue_waits_ms.append((started - job.enqueued_ts) * 1000.0)
+                try:
+                    outputs = await asyncio.to_thread(self._infer_batch, batch)
+                except Exception as e:
+                    logger.exception(f"Batched inference failed for {len(batch)} frames")
+                    for job in batch:
+                        if not job.future.done():
+                            job.future.set_exception(e)
+                    continue
+            self._batch_latencies_ms.append((time.perf_counter() - started) * 1000.0)
+            self._batch_sizes.append(len(batch))
+            self._batches_total += 1
+            self._frames_total += len(batch)
+            for job, out in zip(batch, outputs):
+                if not job.future.done():
+                    job.future.set_result(out)
+
+    def metrics(self) -> Dict[str, Any]:
+        sizes = list(self._batch_sizes)
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_s * 1000.0,
+            "pending": self._pending.qsize(),
+            "batches_total": self._batches_total,
+            "frames_total": self._frames_total,
+            "batch_size_mean": (sum(sizes) / len(sizes)) if sizes else None,
+            "queue_wait_ms": _percentiles(self._queue_waits_ms),
+            "batch_latency_ms": _percentiles(self._batch_latencies_ms),
+        }
+
+
+def _cv_worker_main(conn: Any, shm_name: str, slot_bytes: int, spec: BackendSpec) -> None:
+    """
+    Entry point of a CV worker process: owns one detector and the trackers of
+    its pinned sessions, and decodes their JPEG frames.
+    """
+    import cv2
+
+    shm = SharedMemory(name=shm_name)
+    backend = create_backend(spec)
+    trackers: Dict[str, Any] = {}
+    conn.send(("ready", dict(backend.names)))
+    try:
+        while True:
+            op, arg = conn.recv()
+            if op == "infer":
+                frames: List[np.ndarray] = []
+                session_trackers: List[Any] = []
+                decoded: List[bool] = []
+                for sid, slot, nbytes, inline in arg:
+                    if inline is None:
+                        # The parent's slot holds the JPEG; valid until we reply
+                        inline = np.frombuffer(shm.buf, dtype=np.uint8, count=nbytes, offset=slot * slot_bytes)
+                    frame = cv2.imdecode(np.frombuffer(inline, dtype=np.uint8), cv2.IMREAD_COLOR)
+                    del inline
+                    decoded.append(frame is not None)
+                    if frame is None:
+                        continue
+                    frames.append(frame)
+                    if sid not in trackers:
+                        trackers[sid] = _new_tracker(spec.tracker)
+                    session_trackers.append(trackers[sid])
+                try:
+                    results = iter(_predict_and_track(backend, frames, session_trackers) if frames else [])
+                    # Undecodable frames get no tracks and no shape
+                    conn.send(("ok", [next(results) if ok else (None, None) for ok in decoded]))
+                except Exception as e:
+                    conn.send(("error", repr(e)))
+                del frames
+            elif op == "warmup":
+                _warmup(backend, *arg)
+                conn.send(("ok", None))
+            elif op == "drop":
+                trackers.pop(arg, None)
+                conn.send(("ok", None))
+            elif op == "stop":
+                break
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        shm.close()
+
+
+class _CVWorker:
+    def __init__(self, ctx: Any, slot_bytes: int, n_slots: int, spec: BackendSpec) -> None:
+        self.slot_bytes = slot_bytes
+        self.n_slots = n_slots
+        self.spec = spec
+        self._ctx = ctx
+        self.shm = SharedMemory(create=True, size=slot_bytes * n_slots)
+        self._spawn()
+        # Requests come from scheduler threads and stop_session; one round trip at a time
+        self.lock = threading.Lock()
+        self.sessions = 0
+        self.restarts = 0
+        # Replayed on a respawned process so its first frames do not pay for lazy init
+        self.warmup_args: Optional[tuple] = None
+
+    def _spawn(self) -> None:
+        self.conn, child_conn = self._ctx.Pipe()
+        self.process = self._ctx.Process(
+            target=_cv_worker_main,
+            args=(child_conn, self.shm.name, self.slot_bytes, self.spec),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    @property
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def wait_ready(self) -> Dict[int, str]:
+        try:
+            status, names = self.conn.recv()
+        except EOFError:
+            raise RuntimeError(f"CV worker exited while starting (exit code {self.process.exitcode})")
+        if status != "ready":
+            raise RuntimeError(f"CV worker failed to start: {names}")
+        return names
+
+    def respawn(self) -> None:
+        """Replace an exited process; trackers of its pinned sessions start over in the new one."""
+        with self.lock:
+            if not self.process.is_alive():
+                self._respawn()
+
+    def _respawn(self) -> None:
+        self.process.join(timeout=1)
+        logger.warning(f"CV worker pid {self.process.pid} exited (code {self.process.exitcode}); starting a new one")
+        self.conn.close()
+        self.restarts += 1
+        self._spawn()
+        try:
+            self.wait_ready()
+        except Exception:
+            self.process.kill()
+            raise
+        if self.warmup_args is not None:
+            self._roundtrip("warmup", self.warmup_args)
+
+    def _roundtrip(self, op: str, arg: Any) -> Any:
+        self.conn.send((op, arg))
+        status, result = self.conn.recv()
+        if status != "ok":
+            raise RuntimeError(f"CV worker {op} failed: {result}")
+        return result
+
+    def request(self, op: str, arg: Any) -> Any:
+        with self.lock:
+            if not self.process.is_alive():
+                self._respawn()
+            try:
+                return self._roundtrip(op, arg)
+            except (EOFError, OSError) as e:
+                # The process died mid-request; make sure it is gone so the next request starts a new one
+                self.process.kill()
+                raise RuntimeError(f"CV worker exited during {op} (exit code {self.process.exitcode})") from e
+
+    def infer_batch(self, jobs: List[FrameJob]) -> List[tuple]:
+        items = []
+        for slot, job in enumerate(jobs):
+            jpeg = job.frame
+            nbytes = len(jpeg) if isinstance(jpeg, bytes) else jpeg.nbytes  # type: ignore[union-attr]
+            if slot < self.n_slots and nbytes <= self.slot_bytes:
+                # Hand off the JPEG through shared memory instead of pickling it; the worker decodes
+                start = slot * self.slot_bytes
+                self.shm.buf[start:start + nbytes] = jpeg
+                items.append((job.session.session_id, slot, nbytes, None))
+            else:
+                items.append((job.session.session_id, None, nbytes, bytes(jpeg)))
+        return self.request("infer", items)
+
+    def close(self) -> None:
+        with contextlib.suppress(Exception):
+            with self.lock:
+                self.conn.send(("stop", None))
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+        self.shm.close()
+        with contextlib.suppress(FileNotFoundError):
+            self.shm.unlink()
+
+
+class CVWorkerPool:
+    """
+    N worker processes, each with its own detector, so inference and
+    tracking scale across cores. Sessions are pinned to one worker for
+    their lifetime so tracker state stays consistent.
+    """
+
+    def __init__(self, n_workers: int, spec: BackendSpec, max_batch_size: int, slot_bytes: int) -> None:
+        ctx = mp.get_context("spawn")
+        self.workers = [_CVWorker(ctx, slot_bytes, max_batch_size, spec) for _ in range(n_workers)]
+        self.names: Dict[int, str] = {}
+        try:
+            for w in self.workers:
+                self.names = w.wait_ready()
+        except Exception:
+            self.close()
+            raise
+
+    def pin(self) -> int:
+        alive = [i for i, w in enumerate(self.workers) if w.alive]
+        if not alive:
+            raise RuntimeError("no CV worker process is running")
+        idx = min(alive, key=lambda i: self.workers[i].sessions)
+        self.workers[idx].sessions += 1
+        return idx
+
+    def repin(self, idx: int) -> int:
+        """Move a session off worker idx to the least loaded live worker."""
+        new = self.pin()
+        self.workers[idx].sessions = max(0, self.workers[idx].sessions - 1)
+        return new
+
+    def alive_count(self) -> int:
+        return sum(w.alive for w in self.workers)
+
+    def revive(self) -> None:
+        """Respawn workers whose process has exited; blocks while their models load."""
+        for i, w in enumerate(self.workers):
+            if w.alive:
+                continue
+            try:
+                w.respawn()
+            except Exception as e:
+                logger.error(f"CV worker {i} could not be restarted: {e!r}")
+
+    def release(self, idx: int, session_id: str) -> None:
+        w = self.workers[idx]
+        w.sessions = max(0, w.sessions - 1)
+        w.request("drop", session_id)
+
+    def warmup(self, sizes: List[tuple], batch_sizes: List[int]) -> None:
+        for w in self.workers:
+            w.warmup_args = (sizes, batch_sizes)
+            w.request("warmup", w.warmup_args)
+
+    def close(self) -> None:
+        for w in self.workers:
+            w.close()
 
 
 class CVService:
-    def __init__(self, summary_interval_s: float = 3.0, idle_timeout_s: float = 300.0) -> None:
+    def __init__(
+        self,
+        summary_interval_s: float = 3.0,
+        idle_timeout_s: float = 300.0,
+        backend: Optional[InferenceBackend] = None,
+        genai_client: Any = None,
+    ) -> None:
+        """
+        backend / genai_client may be injected (e.g. stubs for benchmarks); an
+        injected backend always runs in-process.
+        """
         # Load env (dev) for GOOGLE_API_KEY, etc.
         load_dotenv()
 
-        # Load heavy resources ONCE
-        device = "cuda" if os.getenv("YOLO_DEVICE", "cuda") == "cuda" else "cpu"
-        self.model = YOLO(os.getenv("YOLO_MODEL", "yolov8n.pt")).to(device)
-        self.genai_client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
-
         # Parameters from user's script
-        self.classes: List[int] = [0, 15, 16, 1, 2, 3, 5, 6, 7, 8, 9, 11, 12, 13, 56, 57, 59, 60, 61, 71, 72, 62, 74]
+        self.classes: List[int] = list(TRACKED_CLASSES)
+
+        # Load heavy resources ONCE (per worker process when CV_WORKERS > 0)
+        self.backend_spec = BackendSpec(
+            kind=os.getenv("CV_BACKEND", "ultralytics"),
+            model_path=os.getenv("YOLO_MODEL", "yolov8n.pt"),
+            device="cuda" if os.getenv("YOLO_DEVICE", "cuda") == "cuda" else "cpu",
+            classes=self.classes,
+            int8=os.getenv("CV_INT8", "0") == "1",
+            tracker=os.getenv("CV_TRACKER", "bytetrack"),
+        )
+        if self.backend_spec.kind not in INFERENCE_BACKENDS:
+            raise ValueError(f"CV_BACKEND must be one of {INFERENCE_BACKENDS}")
+        if self.backend_spec.tracker not in TRACKERS:
+            raise ValueError(f"CV_TRACKER must be one of {TRACKERS}")
+        self._max_batch_size = int(os.getenv("YOLO_MAX_BATCH_SIZE", "8"))
+        self._max_wait_ms = float(os.getenv("YOLO_MAX_WAIT_MS", "10"))
+        # Batches in flight across all model instances; 0 lets every instance run at once
+        self._max_concurrency = int(os.getenv("YOLO_MAX_CONCURRENCY", "0"))
+        self._n_workers = int(os.getenv("CV_WORKERS", "0"))
+        self._warmup_sizes = _parse_sizes(os.getenv("CV_WARMUP_SIZES", "640x480"))
+        self._pool: Optional[CVWorkerPool] = None
+        self.backend: Optional[InferenceBackend] = backend
+        self.names: Dict[int, str] = {}
+        self.genai_client = genai_client
+        # Models load in the background; sessions are refused until ready
+        self.status = "loading"
+        self.status_detail: Optional[str] = None
+        self._ready = asyncio.Event()
+        self._schedulers: List[InferenceScheduler] = []
+
         self.DISTANCE_STABILITY_FRAMES = 8
         self.POSITION_STABILITY_FRAMES = 6
-        # Process every received frame; frontend already samples as needed
+        # Scene objects unseen for this many processed frames or seconds are evicted
+        # with a lost_object event; the cap bounds memory for hour-long sessions
+        self.SCENE_MAX_MISSED_FRAMES = int(os.getenv("CV_SCENE_MAX_MISSED_FRAMES", "30"))
+        self.SCENE_MAX_MISSED_S = float(os.getenv("CV_SCENE_MAX_MISSED_S", "5"))
+        self.SCENE_MAX_OBJECTS = int(os.getenv("CV_SCENE_MAX_OBJECTS", "128"))
+        # Default stride; a session's sampling_rate overrides it
         self.PROCESS_EVERY_N_FRAMES = 1
-        # No summarization window/cooldown; summarize immediately on new events
+        # Static scenes back off inference up to GATE_MAX_INTERVAL frames (1 disables);
+        # GATE_MOTION_THRESHOLD is the mean thumbnail difference (0-255) counted as motion
+        self.GATE_MAX_INTERVAL = int(os.getenv("CV_GATE_MAX_INTERVAL", "8"))
+        self.GATE_MOTION_THRESHOLD = float(os.getenv("CV_GATE_MOTION_THRESHOLD", "6"))
+        # Summaries are rate limited per session (summary_interval_s); an in-flight
+        # LLM call may be superseded by newer events this many times per round
+        self.SUMMARY_MAX_RESTARTS = 1
+        # A subscriber whose pending summary has gone unsent this long is dropped as stalled
+        self.SUBSCRIBER_MAX_LAG_S = float(os.getenv("CV_SUBSCRIBER_MAX_LAG_S", "10"))
+        # Local template narration is spoken instantly; the LLM summary follows as a refinement
+        self._local_narration = os.getenv("CV_LOCAL_NARRATION", "1") == "1"
+        self._llm_summaries = os.getenv("CV_LLM_SUMMARIES", "1") == "1"
+        self._summary_cache = SummaryCache(
+            max_size=int(os.getenv("CV_SUMMARY_CACHE_SIZE", "1024")),
+            ttl_s=float(os.getenv("CV_SUMMARY_CACHE_TTL_S", "300")),
+        )
 
         self._sessions: Dict[str, SessionState] = {}
         self._lock = asyncio.Lock()
+        # Default backpressure; sessions may override in start_session params
+        self._queue_policy = os.getenv("CV_QUEUE_POLICY", "latest")
+        self._queue_maxsize = int(os.getenv("CV_QUEUE_MAXSIZE", "4"))
         self._summary_interval_s = summary_interval_s
         self._idle_timeout_s = idle_timeout_s
         self._shutdown = False
+        # With several uvicorn workers, CV_SHARD_DIR enables relaying requests to the session's owner
+        shard_dir = os.getenv("CV_SHARD_DIR")
+        self._shards: Optional[ShardRouter] = ShardRouter(self, shard_dir) if shard_dir else None
+        self._shards_task: Optional[asyncio.Task] = asyncio.create_task(self._shards.start()) if self._shards else None
+        if self._shards_task:
+            self._shards_task.add_done_callback(self._on_shards_started)
         self._reaper_task: Optional[asyncio.Task] = asyncio.create_task(self._reaper_loop())
-        # Limit concurrent GPU inference if needed
-        self._infer_sem = asyncio.Semaphore(int(os.getenv("YOLO_MAX_CONCURRENCY", "1")))
+        self._load_task: Optional[asyncio.Task] = asyncio.create_task(self._load())
+
+    def _on_shards_started(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.opt(exception=task.exception()).error(
+                "CV shard relay failed to start; sessions owned by this worker are unreachable from others"
+            )
+
+    async def _load(self) -> None:
+        started = time.perf_counter()
+        try:
+            infer_fns = await asyncio.to_thread(self._load_resources)
+        except Exception as e:
+            self.status, self.status_detail = "error", repr(e)
+            logger.exception("CV service failed to load")
+            self._ready.set()
+            return
+        # One scheduler per model instance batches frames across its sessions into a single call
+        limiter = asyncio.Semaphore(self._max_concurrency) if self._max_concurrency > 0 else None
+        self._schedulers = [
+            InferenceScheduler(
+                fn, max_batch_size=self._max_batch_size, max_wait_ms=self._max_wait_ms, limiter=limiter
+            )
+            for fn in infer_fns
+        ]
+        for sched in self._schedulers:
+            sched.start()
+        self.status = "ready"
+        self._ready.set()
+        logger.info(f"CV service ready in {time.perf_counter() - started:.1f}s")
+
+    def _load_resources(self) -> List[Callable[[List[FrameJob]], List[tuple]]]:
+        # Runs in a thread: model load, export and warmup all block
+        batch_sizes = sorted({1, self._max_batch_size})
+        if self.backend is None and self._n_workers > 0:
+            self._pool = CVWorkerPool(
+                self._n_workers,
+                export_model(self.backend_spec),
+                self._max_batch_size,
+                # Slots carry JPEGs, not pixels; larger frames fall back to the pipe
+                slot_bytes=int(os.getenv("CV_SHM_SLOT_BYTES", str(1 << 20))),
+            )
+            self.names = self._pool.names
+            self._pool.warmup(self._warmup_sizes, batch_sizes)
+            infer_fns = [w.infer_batch for w in self._pool.workers]
+        else:
+            if self.backend is None:
+                self.backend = create_backend(self.backend_spec)
+            self.names = self.backend.names
+            _warmup(self.backend, self._warmup_sizes, batch_sizes)
+            infer_fns = [self._infer_batch]
+        if self.genai_client is None:
+            from google import genai
+
+            self.genai_client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
+        return infer_fns
+
+    def readiness(self) -> Dict[str, Any]:
+        if self.status == "ready" and self._pool and not self._pool.alive_count():
+            # Until the reaper manages to restart one, no session can be served
+            return {"status": "error", "detail": "no CV worker process is running"}
+        return {"status": self.status, "detail": self.status_detail}
+
+    async def wait_ready(self) -> None:
+        await self._ready.wait()
+        if self.status != "ready":
+            raise RuntimeError(f"CV service failed to load: {self.status_detail}")
 
     async def shutdown(self) -> None:
         self._shutdown = True
+        if self._load_task and not self._load_task.done():
+            self._load_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._load_task
         if self._reaper_task:
             self._reaper_task.cancel()
             with contextlib.suppress(asyncio.CancelledError):
@@ -80,6 +1215,12 @@ class CVService:
         # Stop all sessions
         for sid in list(self._sessions.keys()):
             await self.stop_session(sid)
+        for sched in self._schedulers:
+            await sched.stop()
+        if self._pool:
+            await asyncio.to_thread(self._pool.close)
+        if self._shards:
+            await self._shards.close()
 
     async def _reaper_loop(self) -> None:
         try:
@@ -91,130 +1232,348 @@ class CVService:
                         stale.append(sid)
                 for sid in stale:
                     await self.stop_session(sid)
+                await self._check_workers()
                 await asyncio.sleep(5)
         except asyncio.CancelledError:
             pass
 
+    async def _check_workers(self) -> None:
+        """Restart exited worker processes and move sessions off any that stay down."""
+        if not self._pool or self._pool.alive_count() == len(self._pool.workers):
+            return
+        await asyncio.to_thread(self._pool.revive)
+        for st in list(self._sessions.values()):
+            if not self._pool.workers[st.worker].alive:
+                with contextlib.suppress(RuntimeError):
+                    st.worker = self._pool.repin(st.worker)
+
     async def start_session(self, params: Optional[Dict[str, Any]] = None) -> str:
+        state = self.readiness()
+        if state["status"] != "ready":
+            raise RuntimeError(f"CV service is {state['status']}")
         # Optionally adapt parameters per session from params
-        sid = str(uuid.uuid4())
-        st = SessionState(session_id=sid)
+        params = params or {}
+        policy = params.get("queue_policy") or self._queue_policy
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"queue_policy must be one of {QUEUE_POLICIES}")
+        maxsize = 1 if policy == "latest" else max(1, params.get("queue_maxsize") or self._queue_maxsize)
+        sid = self._shards.new_session_id() if self._shards else str(uuid.uuid4())
+        interval = params.get("summary_interval_s")
+        sampling_rate = params.get("sampling_rate")
+        st = SessionState(
+            session_id=sid,
+            queue=asyncio.Queue(maxsize=maxsize),
+            queue_policy=policy,
+            summary_interval_s=self._summary_interval_s if interval is None else max(0.0, interval),
+            process_every_n=max(1, sampling_rate or self.PROCESS_EVERY_N_FRAMES),
+        )
+        if self._pool:
+            st.worker = self._pool.pin()
+        else:
+            st.tracker = _new_tracker(self.backend_spec.tracker)
         st.task = asyncio.create_task(self._session_worker(st))
+        st.summary_task = asyncio.create_task(self._summary_loop(st))
         async with self._lock:
             self._sessions[sid] = st
         return sid
 
+    def _is_remote(self, session_id: str) -> bool:
+        return self._shards is not None and not self._shards.is_local(session_id)
+
     async def stop_session(self, session_id: str) -> None:
+        if self._is_remote(session_id):
+            await self._shards.stop_session(session_id)  # type: ignore[union-attr]
+            return
         async with self._lock:
             st = self._sessions.pop(session_id, None)
         if not st:
             return
-        if st.task:
-            st.task.cancel()
-            with contextlib.suppress(asyncio.CancelledError):
-                await st.task
+        for task in (st.task, st.summary_task):
+            if task:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+        for sub in st.subscribers:
+            sub.close("session_stopped")
+        if self._pool:
+            with contextlib.suppress(Exception):
+                await asyncio.to_thread(self._pool.release, st.worker, session_id)
 
-    async def enqueue_frames(self, session_id: str, frames: List[bytes], timestamps: Optional[List[float]] = None) -> None:
+    async def enqueue_frames(
+        self, session_id: str, frames: Sequence[FrameBytes], timestamps: Optional[List[float]] = None
+    ) -> int:
+        """Queue frames for a session according to its backpressure policy; returns frames dropped."""
+        if self._is_remote(session_id):
+            return await self._shards.enqueue_frames(session_id, frames, timestamps)  # type: ignore[union-attr]
         st = self._sessions.get(session_id)
         if not st:
             raise KeyError("session not found")
         st.last_activity_ts = time.time()
+        st.frames_received += len(frames)
+        dropped = 0
+        if st.queue_policy == "latest" and len(frames) > 1:
+            # Only the newest frame matters; older ones would describe where the user was
+            dropped += len(frames) - 1
+            frames = frames[-1:]
+            timestamps = timestamps[-1:] if timestamps else timestamps
         payload = {
             "type": "frames",
             "frames": frames,
             "timestamps": timestamps,
+            "received_ts": time.perf_counter(),
         }
-        await st.queue.put(payload)
+        if st.queue.full():
+            if st.queue_policy == "bounded":
+                dropped += len(frames)
+                st.frames_dropped += dropped
+                return dropped
+            # drop_oldest / latest: evict stale payloads to make room for this one
+            while st.queue.full():
+                stale = st.queue.get_nowait()
+                dropped += len(stale["frames"])
+        st.queue.put_nowait(payload)
+        st.frames_dropped += dropped
+        return dropped
 
     async def enqueue_clip(self, session_id: str, clip_bytes: bytes, fps: Optional[float] = None) -> None:
         raise NotImplementedError("Video clip ingestion is disabled; send discrete JPEG frames via /cv/frames")
 
-    def get_latest_summary(self, session_id: str) -> Optional[Summary]:
+    async def get_latest_summary(self, session_id: str) -> Optional[Summary]:
+        if self._is_remote(session_id):
+            summ = await self._shards.get_latest_summary(session_id)  # type: ignore[union-attr]
+            return Summary(**summ) if summ else None
         st = self._sessions.get(session_id)
         if not st:
             return None
         return st.latest_summary
 
-    def subscribe(self, session_id: str, callback: Callable[[Summary], None]) -> None:
+    async def subscribe(self, session_id: str) -> SummarySubscription:
+        """Subscribe to a session's summaries; read them as serialized JSON with `await sub.get()`."""
+        sub = SummarySubscription()
+        if self._is_remote(session_id):
+            await self._shards.subscribe(session_id, sub)  # type: ignore[union-attr]
+            return sub
         st = self._sessions.get(session_id)
         if not st:
             raise KeyError("session not found")
-        st.subscribers.add(callback)
+        st.subscribers.add(sub)
+        return sub
 
-    def unsubscribe(self, session_id: str, callback: Callable[[Summary], None]) -> None:
+    def unsubscribe(self, session_id: str, sub: SummarySubscription) -> None:
+        if self._is_remote(session_id):
+            self._shards.unsubscribe(session_id, sub)  # type: ignore[union-attr]
+            return
         st = self._sessions.get(session_id)
-        if not st:
+        if not st or sub not in st.subscribers:
             return
-        st.subscribers.discard(callback)
+        st.subscribers.discard(sub)
+        if sub.close_reason == "slow_consumer":
+            st.subscribers_dropped += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "session_count": len(self._sessions),
+            "shard_id": self._shards.shard_id if self._shards else None,
+            "backend": self.backend_spec.kind,
+            "tracker": self.backend_spec.tracker,
+            "workers": len(self._pool.workers) if self._pool else 0,
+            "workers_alive": self._pool.alive_count() if self._pool else 0,
+            "worker_restarts": sum(w.restarts for w in self._pool.workers) if self._pool else 0,
+            "schedulers": [sched.metrics() for sched in self._schedulers],
+            "summary_cache": self._summary_cache.metrics(),
+            "sessions": {sid: st.metrics() for sid, st in list(self._sessions.items())},
+        }
 
     async def _session_worker(self, st: SessionState) -> None:
         try:
-            version = 0
             while True:
                 item = await st.queue.get()
                 if item["type"] == "frames":
-                    frames: List[bytes] = item["frames"]
-                    await self._process_frames_payload(st, frames)
-
-                # Immediate summarization on new events
-                if st.event_buffer:
-                    import json
+                    frames: Sequence[FrameBytes] = item["frames"]
                     try:
-                        fingerprint = json.dumps(st.event_buffer, sort_keys=True)
+                        events = await self._process_frames_payload(st, frames, item.get("received_ts"))
                     except Exception:
-                        fingerprint = repr(st.event_buffer)
-
-                    if fingerprint != st.last_events_fingerprint:
-                        text = await self._summarize_scene(st.event_buffer)
+                        # A failed batch (or a dead worker) costs this payload, not the session
+                        st.payload_errors += 1
+                        logger.exception(f"Session {st.session_id}: processing {len(frames)} frames failed")
+                        events = []
+                    if events and self._local_narration:
+                        text = narrate(events)
                         if text:
-                            version += 1
-                            now = time.time()
-                            summary = Summary(ts=now, version=version, text=text)
-                            st.latest_summary = summary
-                            for cb in list(st.subscribers):
-                                with contextlib.suppress(Exception):
-                                    cb(summary)
-                            st.last_events_fingerprint = fingerprint
-                            logger.info(
-                                f"Session {st.session_id}: summary v{version} emitted"
-                            )
-                    # Clear buffer to await future changes
+                            self._publish_summary(st, text, {"source": "local", "urgent": is_urgent(events)})
+                if not self._llm_summaries:
                     st.event_buffer.clear()
+                elif st.event_buffer:
+                    st.events_ready.set()
         except asyncio.CancelledError:
             return
 
-    async def _process_frames_payload(self, st: SessionState, frames: List[bytes]) -> None:
-        for fb in frames:
+    async def _summary_loop(self, st: SessionState) -> None:
+        """
+        Turns buffered scene events into summaries, at most one LLM call per
+        summary_interval_s. Events arriving in between are coalesced into the
+        next call; an in-flight call is abandoned and restarted with the merged
+        events if newer ones arrive within the same interval (at most
+        SUMMARY_MAX_RESTARTS times, since abandoned calls still cost a request).
+        """
+        call: Optional[asyncio.Task] = None
+        newer: Optional[asyncio.Task] = None
+        try:
+            while True:
+                await st.events_ready.wait()
+                wait = st.last_summary_start + st.summary_interval_s - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                round_started = time.monotonic()
+                pending: List[Any] = []
+                text = ""
+                fingerprint = None
+                restarts = 0
+                while True:
+                    st.events_ready.clear()
+                    pending.extend(st.event_buffer)
+                    st.event_buffer.clear()
+                    fingerprint = self._events_fingerprint(pending)
+                    if fingerprint == st.last_events_fingerprint:
+                        break
+                    st.last_summary_start = time.monotonic()
+                    call = asyncio.create_task(self._summarize_scene(list(pending)))
+                    newer = asyncio.create_task(st.events_ready.wait())
+                    await asyncio.wait({call, newer}, return_when=asyncio.FIRST_COMPLETED)
+                    if (
+                        not call.done()
+                        and restarts < self.SUMMARY_MAX_RESTARTS
+                        and time.monotonic() - round_started < st.summary_interval_s
+                    ):
+                        # Stale: restart with the merged events rather than describe an old scene
+                        call.cancel()
+                        restarts += 1
+                        continue
+                    newer.cancel()
+                    text = await call
+                    break
+                if text:
+                    st.last_events_fingerprint = fingerprint
+                    self._publish_summary(st, text, {"source": "llm"})
+        except asyncio.CancelledError:
+            for task in (call, newer):
+                if task:
+                    task.cancel()
+            return
+
+    def _events_fingerprint(self, events: List[Any]) -> str:
+        try:
+            return json.dumps(events, sort_keys=True)
+        except Exception:
+            return repr(events)
+
+    def _publish_summary(self, st: SessionState, text: str, extra: Optional[Dict[str, Any]] = None) -> Summary:
+        st.summary_version += 1
+        summary = Summary(ts=time.time(), version=st.summary_version, text=text, extra=extra or {})
+        st.latest_summary = summary
+        if st.subscribers:
+            # Serialized once; every subscriber of the session is sent the same string
+            payload = json.dumps(
+                {
+                    "type": "summary",
+                    "session_id": st.session_id,
+                    "ts": summary.ts,
+                    "version": summary.version,
+                    "text": summary.text,
+                    "audio_url": summary.audio_url,
+                    "extra": summary.extra,
+                }
+            )
+            for sub in list(st.subscribers):
+                if sub.lag_s() > self.SUBSCRIBER_MAX_LAG_S:
+                    # Stalled consumer: stop holding summaries for it; its socket gets closed
+                    sub.close("slow_consumer")
+                    self.unsubscribe(st.session_id, sub)
+                elif not sub.offer(summary.version, payload):
+                    st.summaries_superseded += 1
+        logger.info(f"Session {st.session_id}: summary v{summary.version} emitted")
+        return summary
+
+    async def _process_frames_payload(
+        self, st: SessionState, frames: Sequence[FrameBytes], received_ts: Optional[float] = None
+    ) -> List[Any]:
+        """Runs a payload through detection and scene update; returns the events it produced."""
+        # JPEG decode releases the GIL; keep it off the event loop
+        all_frames = await asyncio.to_thread(self._decode_frames, frames, self._pool is None)
+        # Never back off while something is very close to the user
+        scene = st.scene
+        force = bool(np.any(scene.active & (scene.dist == DISTANCES.index("very_close"))))
+        decoded: List[Union[np.ndarray, FrameBytes]] = []
+        for frame, thumb in all_frames:
             st.frame_idx += 1
-            arr = np.frombuffer(fb, dtype=np.uint8)
-            frame = cv2.imdecode(arr, cv2.IMREAD_COLOR)
-            if frame is None:
+            if thumb is None:
+                continue
+            if st.frame_idx % st.process_every_n != 0:
+                continue
+            if not st.gate.should_infer(thumb, self.GATE_MOTION_THRESHOLD, self.GATE_MAX_INTERVAL, force):
                 continue
-            if st.frame_idx % self.PROCESS_EVERY_N_FRAMES != 0:
+            decoded.append(frame)
+        if not decoded:
+            return []
+        # Submit the whole payload at once; the scheduler keeps per-session order within a batch
+        scheduler = self._schedulers[st.worker]
+        futures = [scheduler.submit(st, frame) for frame in decoded]
+        try:
+            all_tracks = await asyncio.gather(*futures)
+        except asyncio.CancelledError:
+            for fut in futures:
+                fut.cancel()
+            raise
+        payload_events: List[Any] = []
+        for tracks, shape in all_tracks:
+            if shape is None:
                 continue
-            async with self._infer_sem:
-                results = await asyncio.to_thread(
-                    self.model.track,
-                    frame,
-                    classes=self.classes,
-                    conf=0.5,
-                    imgsz=640,
-                    persist=True,
-                    verbose=False,
-                )
-            detections = self._extract_detections(results, frame.shape)
+            detections = self._extract_detections(tracks, shape)
             events = self._update_scene(st, detections)
             if events:
                 st.event_buffer.extend(events)
+                payload_events.extend(events)
             logger.info(
-                f"Session {st.session_id}: detections={len(detections)} events={len(events)}"
+                f"Session {st.session_id}: detections={len(detections['id'])} events={len(events)}"
             )
+        if received_ts is not None:
+            age_ms = (time.perf_counter() - received_ts) * 1000.0
+            st.frame_ages_ms.extend([age_ms] * len(decoded))
+        return payload_events
+
+    def _decode_frames(self, frames: Sequence[FrameBytes], full: bool = True) -> List[tuple]:
+        import cv2
+
+        # (frame, motion-gate thumbnail) per payload frame, thumbnail None when undecodable.
+        # In pool mode only the thumbnail is decoded here and the worker decodes the JPEG.
+        out: List[tuple] = []
+        for fb in frames:
+            if not full:
+                out.append((fb, MotionGate.thumbnail_from_jpeg(fb)))
+                continue
+            frame = cv2.imdecode(np.frombuffer(fb, dtype=np.uint8), cv2.IMREAD_COLOR)
+            out.append((frame, MotionGate.thumbnail(frame) if frame is not None else None))
+        return out
+
+    def _infer_batch(self, jobs: List[FrameJob]) -> List[tuple]:
+        # Runs in a scheduler thread (in-process mode)
+        return _predict_and_track(self.backend, [job.frame for job in jobs], [job.session.tracker for job in jobs])
 
     # Clip processing removed; only discrete frames are supported
 
     async def _summarize_scene(self, events: List[Any]) -> str:
         if not events:
             return ""
+        key = SummaryCache.canonical_key(events)
+        cached = self._summary_cache.get(key)
+        if cached is not None:
+            return cached
+        text = await self._generate_scene_summary(events)
+        if text:
+            self._summary_cache.put(key, text)
+        return text
+
+    async def _generate_scene_summary(self, events: List[Any]) -> str:
         prompt = f"""
 You are describing a visual scene to a blind user.
 Summarize the following observed changes clearly and concisely.
@@ -229,7 +1588,8 @@ Events:
                 contents=prompt,
             )
             return self._extract_gemini_text(r)
-        except Exception:
+        except Exception as e:
+            logger.warning(f"Scene summary failed, keeping local narration: {e!r}")
             return ""
 
     def _extract_gemini_text(self, response: Any) -> str:
@@ -241,105 +1601,96 @@ Events:
             return " ".join(texts).strip()
         return ""
 
-    def _classify_position(self, x: float, w: float) -> str:
-        if x < w * 0.33:
-            return "left"
-        if x > w * 0.66:
-            return "right"
-        return "center"
+    def _classify_positions(self, xc: np.ndarray, w: float) -> np.ndarray:
+        # Codes index POSITIONS
+        return np.where(xc < w * 0.33, 0, np.where(xc > w * 0.66, 2, 1)).astype(np.int8)
 
-    def _classify_distance(self, area: float, frame_area: float) -> str:
+    def _classify_distances(self, area: np.ndarray, frame_area: float) -> np.ndarray:
+        # Codes index DISTANCES
         r = area / frame_area
-        if r > 0.25:
-            return "very_close"
-        if r > 0.1:
-            return "near"
-        return "far"
-
-    def _hysteresis_update(self, stable, candidate, count, new, threshold):
-        if new == stable:
-            return stable, None, 0, False
-        if candidate == new:
-            count += 1
-        else:
-            candidate = new
-            count = 1
-        if count >= threshold:
-            return new, None, 0, True
-        return stable, candidate, count, False
+        return np.where(r > 0.25, 0, np.where(r > 0.1, 1, 2)).astype(np.int8)
 
-    def _extract_detections(self, results: Any, shape: Any) -> List[Dict[str, Any]]:
+    def _extract_detections(self, tracks: np.ndarray, shape: Any) -> Dict[str, np.ndarray]:
+        # tracks rows are BYTETracker output: [x1, y1, x2, y2, track_id, score, cls, idx]
         h, w, _ = shape
-        frame_area = h * w
-        boxes = results[0].boxes
-        if boxes.id is None:
-            return []
-        detections: List[Dict[str, Any]] = []
-        for box, tid, cls in zip(
-            boxes.xyxy.cpu().numpy(),
-            boxes.id.cpu().numpy(),
-            boxes.cls.cpu().numpy(),
-        ):
-            x1, y1, x2, y2 = box
-            area = float((x2 - x1) * (y2 - y1))
-            xc = float((x1 + x2) / 2)
-            detections.append(
-                {
-                    "type": self.model.names[int(cls)],
-                    "id": int(tid),
-                    "position": self._classify_position(xc, w),
-                    "distance": self._classify_distance(area, frame_area),
-                }
+        if tracks is None or len(tracks) == 0:
+            tracks = np.zeros((0, 7), dtype=np.float32)
+        x1, y1, x2, y2 = tracks[:, 0], tracks[:, 1], tracks[:, 2], tracks[:, 3]
+        return {
+            "cls": tracks[:, 6].astype(np.int32),
+            "id": tracks[:, 4].astype(np.int64),
+            "position": self._classify_positions((x1 + x2) / 2, w),
+            "distance": self._classify_distances((x2 - x1) * (y2 - y1), float(h * w)),
+        }
+
+    def _event_detection(self, scene: SceneState, slot: int) -> Dict[str, Any]:
+        return {
+            "type": self.names[int(scene.cls[slot])],
+            "id": int(scene.tid[slot]),
+            "position": POSITIONS[scene.pos[slot]],
+            "distance": DISTANCES[scene.dist[slot]],
+        }
+
+    def _update_scene(self, st: SessionState, detections: Dict[str, np.ndarray]) -> List[Any]:
+        scene = st.scene
+        scene.tick += 1
+        now = time.monotonic()
+        n = len(detections["id"])
+        if n == 0:
+            return self._evict_stale(scene, now)
+        keys = list(zip(detections["cls"].tolist(), detections["id"].tolist()))
+        slots = np.fromiter((scene.slot_of.get(k, -1) for k in keys), dtype=np.int64, count=n)
+        is_new = slots < 0
+        for i in np.flatnonzero(is_new):
+            slots[i] = scene.add(keys[i], detections["position"][i], detections["distance"][i])
+        scene.seen_tick[slots] = scene.tick
+        scene.seen_ts[slots] = now
+
+        known = ~is_new
+        # distance_change reports the position as it stood before this frame's update
+        prev_pos = scene.pos[slots]
+        dist_changed = np.zeros(n, dtype=bool)
+        pos_changed = np.zeros(n, dtype=bool)
+        if known.any():
+            ks = slots[known]
+            dist_changed[known] = _hysteresis(
+                scene.dist, scene.dist_cand, scene.dist_cnt, ks,
+                detections["distance"][known], self.DISTANCE_STABILITY_FRAMES,
+            )
+            pos_changed[known] = _hysteresis(
+                scene.pos, scene.pos_cand, scene.pos_cnt, ks,
+                detections["position"][known], self.POSITION_STABILITY_FRAMES,
             )
-        return detections
 
-    def _update_scene(self, st: SessionState, detections: List[Dict[str, Any]]) -> List[Any]:
         events: List[Any] = []
-        for d in detections:
-            oid = f"{d['type']}_{d['id']}"
-            if oid not in st.scene_objects:
-                st.scene_objects[oid] = {
-                    "type": d["type"],
-                    "position": d["position"],
-                    "distance": d["distance"],
-                    "pc": None,
-                    "pcn": 0,
-                    "dc": None,
-                    "dcn": 0,
-                }
+        for i in np.flatnonzero(is_new | dist_changed | pos_changed):
+            d = self._event_detection(scene, int(slots[i]))
+            if is_new[i]:
                 events.append(("new_object", d))
                 continue
-            o = st.scene_objects[oid]
-            o["distance"], o["dc"], o["dcn"], dc = self._hysteresis_update(
-                o["distance"], o["dc"], o["dcn"], d["distance"], self.DISTANCE_STABILITY_FRAMES
-            )
-            if dc:
-                events.append(
-                    (
-                        "distance_change",
-                        {
-                            "type": o["type"],
-                            "id": d["id"],
-                            "position": o["position"],
-                            "distance": o["distance"],
-                        },
-                    )
-                )
-            o["position"], o["pc"], o["pcn"], pc = self._hysteresis_update(
-                o["position"], o["pc"], o["pcn"], d["position"], self.POSITION_STABILITY_FRAMES
-            )
-            if pc:
-                events.append(
-                    (
-                        "position_change",
-                        {
-                            "type": o["type"],
-                            "id": d["id"],
-                            "position": o["position"],
-                            "distance": o["distance"],
-                        },
-                    )
-                )
+            if dist_changed[i]:
+                events.append(("distance_change", {**d, "position": POSITIONS[prev_pos[i]]}))
+            if pos_changed[i]:
+                events.append(("position_change", d))
+        events.extend(self._evict_stale(scene, now))
+        return events
+
+    def _evict_stale(self, scene: SceneState, now: float) -> List[Any]:
+        stale = scene.active & (
+            (scene.tick - scene.seen_tick > self.SCENE_MAX_MISSED_FRAMES)
+            | (now - scene.seen_ts > self.SCENE_MAX_MISSED_S)
+        )
+        evict = np.flatnonzero(stale)
+        overflow = len(scene) - len(evict) - self.SCENE_MAX_OBJECTS
+        if overflow > 0:
+            # Hard cap: additionally drop the least recently seen survivors
+            survivors = np.flatnonzero(scene.active & ~stale)
+            oldest = survivors[np.argsort(scene.seen_tick[survivors], kind="stable")[:overflow]]
+            evict = np.concatenate([evict, oldest])
+        events: List[Any] = []
+        for slot in evict.tolist():
+            events.append(("lost_object", self._event_detection(scene, slot)))
+            scene.remove(slot)
         return events
 
 
@@ -0,0 +1,258 @@
+"""
+Session affinity for running the CV API in several uvicorn worker
+processes on one host.
+
+Each process owns the sessions it starts, and their IDs carry the owning
+process's shard ID as a prefix. Each process also listens on a unix socket
+at CV_SHARD_DIR/<shard_id>.sock. When a request for a session reaches a
+process that does not own it, that process relays it to the owner over
+the socket. Frames, latest-summary reads, stops and summary subscriptions
+all go through this relay, so clients never need to reach a particular
+worker.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import dataclasses
+import json
+import os
+import re
+import struct
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from services.cv_service import CVService, SummarySubscription
+
+# Message: uint32 header length, JSON header, then the binary blobs whose
+# sizes are listed in header["blobs"] (JPEG frames for the "frames" op)
+_LEN = struct.Struct("<I")
+# Shard IDs as generated below; anything else in a session ID is not a shard we could own
+_SHARD_ID = re.compile(r"[0-9a-f]{8}")
+
+
+async def _send(writer: asyncio.StreamWriter, header: Dict[str, Any], blobs: Sequence[Any] = ()) -> None:
+    data = json.dumps(dict(header, blobs=[len(b) for b in blobs])).encode()
+    writer.write(_LEN.pack(len(data)) + data)
+    for b in blobs:
+        writer.write(b)
+    await writer.drain()
+
+
+async def _recv(reader: asyncio.StreamReader) -> Tuple[Dict[str, Any], List[bytes]]:
+    (n,) = _LEN.unpack(await reader.readexactly(_LEN.size))
+    header = json.loads(await reader.readexactly(n))
+    blobs = [await reader.readexactly(size) for size in header.pop("blobs", [])]
+    return header, blobs
+
+
+class _Peer:
+    """Persistent request/response connection to another shard; one call at a time."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.lock = asyncio.Lock()
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def call(self, header: Dict[str, Any], blobs: Sequence[Any] = ()) -> Dict[str, Any]:
+        async with self.lock:
+            for attempt in range(2):
+                if self.writer is None:
+                    self.reader, self.writer = await asyncio.open_unix_connection(str(self.path))
+                try:
+                    await _send(self.writer, header, blobs)
+                    reply, _ = await _recv(self.reader)  # type: ignore[arg-type]
+                    return reply
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    # The owner restarted or dropped an idle connection; reconnect once
+                    self.close()
+                    if attempt:
+                        raise
+        raise AssertionError("unreachable")
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+class ShardRouter:
+    def __init__(self, svc: "CVService", shard_dir: str) -> None:
+        self.svc = svc
+        self.shard_dir = Path(shard_dir)
+        self.shard_id = uuid.uuid4().hex[:8]
+        self.path = self.shard_dir / f"{self.shard_id}.sock"
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._peers: Dict[str, _Peer] = {}
+        self._subscriptions: Dict[Tuple[str, Any], asyncio.Task] = {}
+        self._clients: Set[asyncio.StreamWriter] = set()
+
+    async def start(self) -> None:
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+        self._server = await asyncio.start_unix_server(self._serve, path=str(self.path))
+        logger.info(f"CV shard {self.shard_id} listening on {self.path} (pid {os.getpid()})")
+
+    async def close(self) -> None:
+        for task in list(self._subscriptions.values()):
+            task.cancel()
+        for peer in self._peers.values():
+            peer.close()
+        if self._server:
+            self._server.close()
+            # Other shards keep their connections open; wait_closed() would wait for them to shut down first
+            for writer in list(self._clients):
+                writer.close()
+            await self._server.wait_closed()
+        with contextlib.suppress(FileNotFoundError):
+            self.path.unlink()
+
+    def new_session_id(self) -> str:
+        return f"{self.shard_id}-{uuid.uuid4()}"
+
+    def is_local(self, session_id: str) -> bool:
+        return session_id.startswith(self.shard_id + "-")
+
+    def _peer(self, session_id: str) -> _Peer:
+        owner = session_id.split("-", 1)[0]
+        if not _SHARD_ID.fullmatch(owner):
+            # Client-supplied; never let it pick an arbitrary socket path
+            raise KeyError("session not found")
+        path = self.shard_dir / f"{owner}.sock"
+        if not path.exists():
+            raise KeyError("session not found")
+        peer = self._peers.get(owner)
+        if peer is None:
+            peer = self._peers[owner] = _Peer(path)
+        return peer
+
+    async def _call(self, session_id: str, header: Dict[str, Any], blobs: Sequence[Any] = ()) -> Any:
+        try:
+            reply = await self._peer(session_id).call(dict(header, session_id=session_id), blobs)
+        except (FileNotFoundError, ConnectionRefusedError):
+            # Owner process is gone along with its sessions
+            raise KeyError("session not found")
+        if not reply["ok"]:
+            raise KeyError(reply.get("error", "session not found"))
+        return reply.get("result")
+
+    # Client side: relay to the owning shard
+
+    async def enqueue_frames(
+        self, session_id: str, frames: Sequence[Any], timestamps: Optional[List[float]] = None
+    ) -> int:
+        return await self._call(session_id, {"op": "frames", "timestamps": timestamps}, frames)
+
+    async def get_latest_summary(self, session_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            return await self._call(session_id, {"op": "latest"})
+        except KeyError:
+            return None
+
+    async def stop_session(self, session_id: str) -> None:
+        with contextlib.suppress(KeyError):
+            await self._call(session_id, {"op": "stop"})
+
+    async def subscribe(self, session_id: str, sub: "SummarySubscription") -> None:
+        path = self._peer(session_id).path
+        try:
+            reader, writer = await asyncio.open_unix_connection(str(path))
+        except (FileNotFoundError, ConnectionRefusedError):
+            raise KeyError("session not found")
+        await _send(writer, {"op": "subscribe", "session_id": session_id})
+        reply, _ = await _recv(reader)
+        if not reply["ok"]:
+            writer.close()
+            raise KeyError(reply.get("error", "session not found"))
+
+        async def pump() -> None:
+            reason = "session_stopped"
+            try:
+                while True:
+                    msg, blobs = await _recv(reader)
+                    if "closed" in msg:
+                        reason = msg["closed"]
+                        break
+                    if sub.lag_s() > self.svc.SUBSCRIBER_MAX_LAG_S:
+                        reason = "slow_consumer"
+                        break
+                    # The owner's serialized payload is passed through untouched
+                    sub.offer(msg["version"], blobs[0].decode())
+            except (ConnectionError, asyncio.IncompleteReadError):
+                pass
+            finally:
+                sub.close(reason)
+                writer.close()
+
+        self._subscriptions[(session_id, sub)] = asyncio.create_task(pump())
+
+    def unsubscribe(self, session_id: str, sub: "SummarySubscription") -> None:
+        task = self._subscriptions.pop((session_id, sub), None)
+        if task:
+            task.cancel()
+
+    # Server side: requests relayed from other shards for sessions we own
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._clients.add(writer)
+        try:
+            while True:
+                header, blobs = await _recv(reader)
+                if header["op"] == "subscribe":
+                    await self._serve_subscription(header["session_id"], reader, writer)
+                    return
+                try:
+                    reply = {"ok": True, "result": await self._dispatch(header, blobs)}
+                except KeyError as e:
+                    reply = {"ok": False, "error": e.args[0] if e.args else "session not found"}
+                except ValueError as e:
+                    reply = {"ok": False, "error": str(e)}
+                await _send(writer, reply)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    async def _dispatch(self, header: Dict[str, Any], blobs: List[bytes]) -> Any:
+        op, sid = header["op"], header["session_id"]
+        if op == "frames":
+            return await self.svc.enqueue_frames(sid, blobs, header.get("timestamps"))
+        if op == "latest":
+            summ = await self.svc.get_latest_summary(sid)
+            return dataclasses.asdict(summ) if summ else None
+        if op == "stop":
+            await self.svc.stop_session(sid)
+            return None
+        raise ValueError(f"unknown shard op {op!r}")
+
+    async def _serve_subscription(
+        self, session_id: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            sub = await self.svc.subscribe(session_id)
+        except KeyError:
+            await _send(writer, {"ok": False, "error": "session not found"})
+            return
+        await _send(writer, {"ok": True})
+        # The relaying shard only ever closes the connection; EOF ends the subscription
+        closed = asyncio.create_task(reader.read())
+        try:
+            while True:
+                getter = asyncio.create_task(sub.get())
+                done, _ = await asyncio.wait({getter, closed}, return_when=asyncio.FIRST_COMPLETED)
+                if closed in done:
+                    getter.cancel()
+                    return
+                payload = getter.result()
+                if payload is None:
+                    await _send(writer, {"closed": sub.close_reason})
+                    return
+                await _send(writer, {"version": sub.version}, [payload.encode()])
+        finally:
+            closed.cancel()
+            self.svc.unsubscribe(session_id, sub)
@@ -0,0 +1,217 @@
+"""
+Ranking of place listings by distance, text relevance and accessibility.
+
+Each POI's rating aggregate is turned into a vector with one score in
+[0, 1] per DisabilityCategory. The vectors are kept in one in-memory
+matrix, so ranking a few thousand candidates is a numpy gather plus
+arithmetic, not a query per place. Scores are Bayesian averages: a place
+with few ratings is pulled toward a neutral prior, so one 5-star rating
+does not outrank a hundred 4.5s. A process only sees its own ratings as
+they happen; the matrix is reloaded from MongoDB after ttl_s to pick up
+those written by other workers.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from loguru import logger
+
+from dtos.poi_partial_dto import POI_PARTIAL_DTO
+from models.category_enum import DisabilityCategory
+from models.poi_rating_aggregate import CategoryRatingAggregate, POIRatingAggregate
+
+CATEGORIES = list(DisabilityCategory)
+_COLUMN = {c: i for i, c in enumerate(CATEGORIES)}
+_COLUMN_BY_VALUE = {c.value: i for i, c in enumerate(CATEGORIES)}
+MAX_SCORE = 5.0
+EARTH_RADIUS_M = 6_371_000.0
+
+
+def haversine_m(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distances in meters from one point to arrays of points."""
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class AccessibilityScores:
+    """Per-POI accessibility score vectors, one row per POI and one column per category."""
+
+    def __init__(self, prior_mean: float = 2.5, prior_count: float = 3.0, ttl_s: float = 300.0) -> None:
+        self.prior_mean = prior_mean
+        self.prior_count = prior_count
+        # Age after which the matrix is reloaded in the background; 0 loads only once
+        self.ttl_s = ttl_s
+        self.loaded = False
+        self._loaded_at = 0.0
+        self._reload: Optional[asyncio.Task] = None
+        self._rows: Dict[str, int] = {}
+        self._matrix = np.zeros((1024, len(CATEGORIES)), dtype=np.float32)
+        self._prior = np.float32(prior_mean / MAX_SCORE)
+        self._load_lock = asyncio.Lock()
+        # Updates that arrive while loading, re-applied once the load is done
+        self._pending: Optional[Dict[str, Dict[str, CategoryRatingAggregate]]] = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def vector(self, categories: Dict[str, CategoryRatingAggregate]) -> np.ndarray:
+        out = np.full(len(CATEGORIES), self._prior, dtype=np.float32)
+        for value, totals in categories.items():
+            column = _COLUMN_BY_VALUE.get(value)
+            if column is not None and totals.count:
+                shrunk = (totals.sum + self.prior_mean * self.prior_count) / (totals.count + self.prior_count)
+                out[column] = shrunk / MAX_SCORE
+        return out
+
+    def set(self, poi_id: str, categories: Dict[str, CategoryRatingAggregate]) -> None:
+        """Replace a POI's vector from its current rating aggregate."""
+        if self._pending is not None:
+            self._pending[poi_id] = categories
+        self._matrix = self._put(self._rows, self._matrix, poi_id, categories)
+
+    def _put(
+        self, rows: Dict[str, int], matrix: np.ndarray, poi_id: str, categories: Dict[str, CategoryRatingAggregate]
+    ) -> np.ndarray:
+        row = rows.get(poi_id)
+        if row is None:
+            row = rows[poi_id] = len(rows)
+            if row == len(matrix):
+                matrix = np.concatenate([matrix, np.zeros_like(matrix)])
+        matrix[row] = self.vector(categories)
+        return matrix
+
+    async def ensure_loaded(self) -> None:
+        # Loaded on first use, from the poi_rating_aggregates collection
+        if self.loaded:
+            if self.ttl_s > 0 and self._reload is None and time.monotonic() - self._loaded_at > self.ttl_s:
+                # Requests keep ranking with the current matrix until the new one is swapped in
+                self._reload = asyncio.create_task(self._reload_in_background())
+            return
+        async with self._load_lock:
+            if self.loaded:
+                return
+            await self._load()
+
+    async def _reload_in_background(self) -> None:
+        try:
+            async with self._load_lock:
+                await self._load()
+        except Exception as e:
+            # Retried after another ttl_s
+            self._loaded_at = time.monotonic()
+            logger.warning(f"Reloading accessibility scores failed: {e!r}")
+        finally:
+            self._reload = None
+
+    async def _load(self) -> None:
+        """Read every aggregate into a new matrix, then swap it in."""
+        rows: Dict[str, int] = {}
+        matrix = np.zeros((max(1024, len(self._rows)), len(CATEGORIES)), dtype=np.float32)
+        self._pending = pending = {}
+        try:
+            async for aggregate in POIRatingAggregate.find_all():
+                matrix = self._put(rows, matrix, aggregate.id, aggregate.categories)
+        finally:
+            self._pending = None
+        # The load may have read a POI before a newer update to it
+        for poi_id, categories in pending.items():
+            matrix = self._put(rows, matrix, poi_id, categories)
+        self._rows, self._matrix = rows, matrix
+        self._loaded_at = time.monotonic()
+        self.loaded = True
+        logger.info(f"Loaded accessibility scores for {len(self)} POIs")
+
+    async def close(self) -> None:
+        if self._reload is not None:
+            self._reload.cancel()
+            await asyncio.gather(self._reload, return_exceptions=True)
+
+    def gather(self, poi_ids: Sequence[str]) -> np.ndarray:
+        """(len(poi_ids), categories) matrix; POIs without ratings get the prior."""
+        rows = np.fromiter((self._rows.get(i, -1) for i in poi_ids), dtype=np.int64, count=len(poi_ids))
+        out = self._matrix[np.maximum(rows, 0)]
+        out[rows < 0] = self._prior
+        return out
+
+
+class PlaceRanker:
+    def __init__(
+        self,
+        distance_weight: float = 1.0,
+        text_weight: float = 1.0,
+        accessibility_weight: float = 1.0,
+        relevant_threshold: float = 0.7,
+        distance_scale_m: float = 2000.0,
+    ) -> None:
+        self.distance_weight = distance_weight
+        self.text_weight = text_weight
+        self.accessibility_weight = accessibility_weight
+        # Score (fraction of 5 stars) from which a place counts as serving a category well
+        self.relevant_threshold = relevant_threshold
+        # Distance at which proximity drops to half; callers with a search radius pass theirs
+        self.distance_scale_m = distance_scale_m
+
+    def rank(
+        self,
+        places: List[POI_PARTIAL_DTO],
+        scores: AccessibilityScores,
+        categories: List[DisabilityCategory],
+        origin: Optional[Tuple[float, float]] = None,
+        text_scores: Optional[Sequence[float]] = None,
+        distance_scale_m: Optional[float] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[POI_PARTIAL_DTO]:
+        """
+        One page of places best first, as copies with relevant_categories filled in. The
+        ranking score is the weighted sum of proximity to origin, text score
+        relative to the best candidate, and the mean score over categories.
+        Proximity is scale / (scale + distance). Terms without an input count
+        as zero, and ties keep the input order.
+        """
+        if not places:
+            return []
+        columns = [_COLUMN[c] for c in categories]
+        access = scores.gather([p.id for p in places])[:, columns]
+        total = self.accessibility_weight * access.mean(axis=1, dtype=np.float64)
+        if origin is not None:
+            lats = np.fromiter((p.latitude for p in places), dtype=np.float64, count=len(places))
+            lons = np.fromiter((p.longitude for p in places), dtype=np.float64, count=len(places))
+            scale = distance_scale_m or self.distance_scale_m
+            total += self.distance_weight * scale / (scale + haversine_m(origin[0], origin[1], lats, lons))
+        if text_scores is not None:
+            text = np.asarray(text_scores, dtype=np.float64)
+            total += self.text_weight * text / max(float(text.max()), 1e-9)
+        order = np.argsort(-total, kind="stable")
+        end = None if limit is None else offset + limit
+        # Only the returned page is copied
+        return self._with_relevant(places, access, categories, order[offset:end])
+
+    def annotate(
+        self, places: List[POI_PARTIAL_DTO], scores: AccessibilityScores, categories: List[DisabilityCategory]
+    ) -> List[POI_PARTIAL_DTO]:
+        """Copies of places, in their order, with relevant_categories filled in."""
+        if not places:
+            return []
+        access = scores.gather([p.id for p in places])[:, [_COLUMN[c] for c in categories]]
+        return self._with_relevant(places, access, categories, range(len(places)))
+
+    def _with_relevant(
+        self,
+        places: List[POI_PARTIAL_DTO],
+        access: np.ndarray,
+        categories: List[DisabilityCategory],
+        order: Iterable[int],
+    ) -> List[POI_PARTIAL_DTO]:
+        relevant = access >= self.relevant_threshold
+        return [
+            places[i].model_copy(update={
+                "relevant_categories": [c for c, ok in zip(categories, relevant[i]) if ok]
+            })
+            for i in order
+        ]
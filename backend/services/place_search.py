@@ -0,0 +1,181 @@
+"""
+In-process search over POI names and categories, for autocomplete.
+
+Names and categories are split into normalized terms. A prefix trie
+completes the word being typed. A trigram index tolerates typos by
+matching terms that share enough trigrams with the query word, in the
+same way as pg_trgm. Every document is held in memory, so a search never
+touches MongoDB. Each term's postings are kept sorted best first, and a
+query only reads the first max_postings of each term it expands to, so a
+keystroke costs the same however many places share a common word.
+"""
+from __future__ import annotations
+
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from collections import deque
+from itertools import islice
+from typing import Dict, Iterable, List, Set, Tuple
+
+from loguru import logger
+
+from dtos.poi_partial_dto import POI_PARTIAL_DTO
+from models.poi import POI
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# How much a term counts depending on where it came from
+NAME_WEIGHT = 1.0
+CATEGORY_WEIGHT = 0.5
+
+# Per query word: an exact term beats a completion, which beats a typo match
+PREFIX_FACTOR = 0.8
+FUZZY_FACTOR = 0.6
+
+
+def normalize(text: str) -> List[str]:
+    """Lower-cased ASCII words; accents are stripped so "café" matches "cafe"."""
+    folded = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return _WORD.findall(folded.lower())
+
+
+def trigrams(term: str) -> Set[str]:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _TrieNode:
+    __slots__ = ("children", "terminal")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _TrieNode] = {}
+        self.terminal = False
+
+
+class PlaceSearchIndex:
+    def __init__(self, max_expansions: int = 64, min_similarity: float = 0.3, max_postings: int = 256) -> None:
+        # Completions considered per query word; the shortest are taken first
+        self.max_expansions = max_expansions
+        self.min_similarity = min_similarity
+        # Places read per matched term; postings are sorted by weight, then name
+        self.max_postings = max_postings
+        self.ready = False
+        self._root = _TrieNode()
+        self._places: Dict[str, POI_PARTIAL_DTO] = {}
+        self._postings: Dict[str, List[Tuple[float, str, str]]] = {}  # term -> sorted [(-weight, name, poi_id)]
+        self._trigrams: Dict[str, Set[str]] = {}  # trigram -> terms
+        self._gram_counts: Dict[str, int] = {}  # term -> number of distinct trigrams
+        self._terms_of: Dict[str, Dict[str, float]] = {}  # poi_id -> {term: weight}
+
+    def __len__(self) -> int:
+        return len(self._places)
+
+    async def build(self) -> None:
+        """Load every POI from MongoDB; places added meanwhile are kept."""
+        async for place in POI.find_all(projection_model=POI_PARTIAL_DTO):
+            if place.id not in self._places:
+                self.add(place)
+        self.ready = True
+        logger.info(f"Place search index built with {len(self)} places")
+
+    def add(self, place: POI_PARTIAL_DTO) -> None:
+        """Index a place, replacing any earlier version of it."""
+        self.remove(place.id)
+        terms: Dict[str, float] = {}
+        for text, weight in [(place.name, NAME_WEIGHT)] + [(c, CATEGORY_WEIGHT) for c in place.categories]:
+            for term in normalize(text):
+                terms[term] = max(terms.get(term, 0.0), weight)
+        for term, weight in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = []
+                self._insert_term(term)
+            insort(postings, (-weight, place.name, place.id))
+        self._places[place.id] = place
+        self._terms_of[place.id] = terms
+
+    def remove(self, place_id: str) -> None:
+        place = self._places.pop(place_id, None)
+        for term, weight in self._terms_of.pop(place_id, {}).items():
+            postings = self._postings[term]
+            entry = (-weight, place.name, place_id)  # type: ignore[union-attr]
+            del postings[bisect_left(postings, entry)]
+            if not postings:
+                # The trie node stays; lookups skip terms without postings
+                del self._postings[term]
+                del self._gram_counts[term]
+                for gram in trigrams(term):
+                    self._trigrams[gram].discard(term)
+
+    def _insert_term(self, term: str) -> None:
+        node = self._root
+        for ch in term:
+            node = node.children.setdefault(ch, _TrieNode())
+        node.terminal = True
+        grams = trigrams(term)
+        self._gram_counts[term] = len(grams)
+        for gram in grams:
+            self._trigrams.setdefault(gram, set()).add(term)
+
+    def _completions(self, prefix: str) -> Iterable[str]:
+        node = self._root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        found: List[str] = []
+        # Breadth-first, so short completions win when the prefix is very common
+        queue = deque([(node, prefix)])
+        while queue and len(found) < self.max_expansions:
+            node, term = queue.popleft()
+            if node.terminal and term in self._postings:
+                found.append(term)
+            queue.extend((child, term + ch) for ch, child in sorted(node.children.items()))
+        return found
+
+    def _similar(self, word: str) -> Iterable[Tuple[str, float]]:
+        grams = trigrams(word)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for term in self._trigrams.get(gram, ()):
+                shared[term] = shared.get(term, 0) + 1
+        # Jaccard similarity of the two trigram sets
+        for term, count in shared.items():
+            similarity = count / (len(grams) + self._gram_counts[term] - count)
+            if similarity >= self.min_similarity:
+                yield term, similarity
+
+    def _word_matches(self, word: str) -> Dict[str, float]:
+        """Best score of each place for one query word."""
+        candidates: Dict[str, float] = {}
+        for term in self._completions(word):
+            candidates[term] = 1.0 if term == word else PREFIX_FACTOR * (0.5 + 0.5 * len(word) / len(term))
+        if len(word) >= 3:
+            for term, similarity in self._similar(word):
+                candidates[term] = max(candidates.get(term, 0.0), FUZZY_FACTOR * similarity)
+        scores: Dict[str, float] = {}
+        for term, factor in candidates.items():
+            for neg_weight, _, place_id in islice(self._postings[term], self.max_postings):
+                score = -factor * neg_weight
+                if score > scores.get(place_id, 0.0):
+                    scores[place_id] = score
+        return scores
+
+    def scores(self, query: str) -> Dict[str, float]:
+        """Relevance of every matching place; places matching more query words score higher."""
+        totals: Dict[str, float] = {}
+        for word in dict.fromkeys(normalize(query)):
+            for place_id, score in self._word_matches(word).items():
+                totals[place_id] = totals.get(place_id, 0.0) + score
+        return totals
+
+    def matches(self, query: str, limit: int = 10) -> List[Tuple[POI_PARTIAL_DTO, float]]:
+        """The best-matching places with their relevance, best first."""
+        totals = self.scores(query)
+        ranked = heapq.nsmallest(limit, totals, key=lambda pid: (-totals[pid], self._places[pid].name))
+        return [(self._places[pid], totals[pid]) for pid in ranked]
+
+    def search(self, query: str, limit: int = 10) -> List[POI_PARTIAL_DTO]:
+        return [place for place, _ in self.matches(query, limit)]
@@ -3,25 +3,23 @@ from models.poi import POI
 from dtos.poi_full_dto import POI_FULL_DTO
 from dtos.poi_partial_dto import POI_PARTIAL_DTO
 from models.poi_ratings import POIRating
-from models.review import Review
 from models.category_user_rating import CategoryRating
-from google import genai
+from models.poi_profile import POIProfile
+from services.ratings_service import get_ratings_service
+from services.reviews_service import get_reviews_service
+from services.place_search import PlaceSearchIndex
+from services.place_ranking import AccessibilityScores, PlaceRanker
+from models.category_enum import DisabilityCategory
+from beanie.operators import In, Inc
+from collections import OrderedDict
+from pydantic import BaseModel, Field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+from loguru import logger
 from os import getenv
+import asyncio
+import time
 
-class PlacesService:
-    def __init__(self, gemini_api_key: str = getenv('GEMINI_API_KEY', '')):
-        if gemini_api_key:
-            self.client = genai.Client(api_key=gemini_api_key).aio
-        else:
-            raise ValueError("Gemini API key is not set in environment variables.")
-        self.model = 'gemini-3-flash-preview'
-
-    async def get_place_by_id(self, place_id: str, user_preferences: UserPreferences) -> POI_FULL_DTO:
-        bare_poi = await POI.get(place_id)
-        poi_reviews = await Review.find(Review.id == place_id).to_list()
-        poi_reviews = [review.review_text for review in poi_reviews]
-
-        summary_prompt = """
+SUMMARY_PROMPT = """
         You are an accessibility-focused summarization assistant.
         I will provide:
         A list of user reviews as strings.
@@ -51,68 +49,435 @@ class PlacesService:
         Generate the summary now based on the provided input.
         """
 
-        summary = await self.client.models.generate_content(
-            model=self.model,
-            contents=[
-                summary_prompt,
-                {
-                    "reviews": poi_reviews,
-                    "disability_categories": user_preferences.selected_categories
-                }
-            ]
+
+def profile_key(place_id: str, category: DisabilityCategory, review_version: int) -> str:
+    return f"{place_id}|{category.value}|{review_version}"
+
+
+def selected_categories(user_preferences: UserPreferences) -> List[DisabilityCategory]:
+    # No selection means the full profile; enum order keeps composed output stable
+    selected = set(user_preferences.selected_categories) or set(DisabilityCategory)
+    return [c for c in DisabilityCategory if c in selected]
+
+
+def compose_profiles(profiles: List[POIProfile]) -> Tuple[str, List[str]]:
+    """Combine per-category profiles into one summary and a de-duplicated excerpt list."""
+    summary = "\n\n".join(p.relevant_summary for p in profiles if p.relevant_summary)
+    excerpts = list(dict.fromkeys(e for p in profiles for e in p.relevant_review_excerpts))
+    return summary, excerpts
+
+
+class POIRef(BaseModel):
+    id: str = Field(alias="_id")
+
+
+class POIReviewVersion(BaseModel):
+    review_version: int = 0
+
+
+class ProfileCache:
+    """In-memory LRU of generated POI profiles, in front of the poi_profiles collection."""
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, POIProfile]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[POIProfile]:
+        profile = self._entries.get(key)
+        if profile is not None:
+            self._entries.move_to_end(key)
+        return profile
+
+    def put(self, key: str, profile: POIProfile):
+        self._entries[key] = profile
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, place_id: str):
+        for key in [k for k, p in self._entries.items() if p.poi_id == place_id]:
+            del self._entries[key]
+
+class PlacesService:
+    def __init__(self, gemini_api_key: str = getenv('GEMINI_API_KEY', '')):
+        if gemini_api_key:
+            from google import genai
+
+            self.client = genai.Client(api_key=gemini_api_key).aio
+        else:
+            raise ValueError("Gemini API key is not set in environment variables.")
+        self.model = 'gemini-3-flash-preview'
+        self.profile_cache = ProfileCache(int(getenv('PLACES_PROFILE_CACHE_SIZE', '1024')))
+        self._generating: Dict[str, asyncio.Future] = {}
+        # Background pipeline: one summary/excerpt set per (POI, category), composed per request
+        self._refresh_queue: asyncio.Queue[str] = asyncio.Queue()
+        self._queued: Dict[str, Set[DisabilityCategory]] = {}
+        # A new review only regenerates eagerly what was read this recently; the rest waits for its next read
+        self.refresh_served_within_s = float(getenv('PLACES_REFRESH_SERVED_WITHIN_S', '900'))
+        self._served: "OrderedDict[str, Tuple[float, Set[DisabilityCategory]]]" = OrderedDict()
+        self._workers = [
+            asyncio.create_task(self._profile_worker())
+            for _ in range(int(getenv('PLACES_PROFILE_WORKERS', '2')))
+        ]
+        if getenv('PLACES_PRECOMPUTE_ON_START', '0') == '1':
+            self._workers.append(asyncio.create_task(self.precompute_all()))
+        # Name/category autocomplete is served from memory; loaded in the background at startup.
+        # Each process has its own index and create_place only updates the local one, so with
+        # several uvicorn workers the index is rebuilt every PLACES_SEARCH_REFRESH_S (0: never)
+        self.search_refresh_s = float(getenv('PLACES_SEARCH_REFRESH_S', '300'))
+        self.search_index = self._new_search_index()
+        self._search_building: Optional[PlaceSearchIndex] = None
+        self._workers.append(asyncio.create_task(self._maintain_search_index()))
+        # Listings are ranked in memory over at most this many candidates
+        self.rank_candidates = int(getenv('PLACES_RANK_CANDIDATES', '2000'))
+        self.ranker = PlaceRanker(
+            distance_weight=float(getenv('PLACES_RANK_DISTANCE_WEIGHT', '1.0')),
+            text_weight=float(getenv('PLACES_RANK_TEXT_WEIGHT', '2.0')),
+            accessibility_weight=float(getenv('PLACES_RANK_ACCESSIBILITY_WEIGHT', '1.0')),
+            relevant_threshold=float(getenv('PLACES_RELEVANT_THRESHOLD', '0.7')),
         )
 
-        excerpts_prompt = """
-        You are an accessibility-focused information extraction assistant.
-        I will provide:
-        A list of user reviews as strings.
-        A list of disability categories that represent the disabilities a person may have.
-        Your task is to extract only the specific excerpts (phrases or sentences) from the reviews that are relevant to the given disability categories.
-        Guidelines:
-        Only extract text that directly relates to accessibility for the provided disability categories.
-        Ignore unrelated content, opinions, or general praise/complaints.
-        Do not paraphrase or summarize — return the exact excerpts from the reviews.
-        If a review contains multiple relevant excerpts, extract each separately.
-        If no excerpt is relevant for a given disability category, return an empty list for that category.
-        Use respectful, inclusive language and avoid assumptions.
-        Input format:
-        {
-        "reviews": ["review 1", "review 2", "..."],
-        "disability_categories": ["category 1", "category 2"]
+    async def get_place_by_id(self, place_id: str, user_preferences: UserPreferences) -> POI_FULL_DTO:
+        bare_poi = await POI.get(place_id)
+        if bare_poi is None:
+            raise KeyError("place not found")
+        categories = selected_categories(user_preferences)
+        self._mark_served(place_id, categories)
+        profiles, overview = await asyncio.gather(
+            self._category_profiles(bare_poi, categories),
+            get_ratings_service().get_category_overview(place_id),
+        )
+        summary, excerpts = compose_profiles(profiles)
+
+        return POI_FULL_DTO(
+            **bare_poi.model_dump(),
+            relevant_summary=summary,
+            relevant_review_excerpts=excerpts,
+            categories_overview=overview,
+        )
+
+    async def stream_place_by_id(
+        self, place_id: str, user_preferences: UserPreferences
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yields (event, data) pairs: "poi" with the POI basics right away, its
+        rating "overview", then per category "summary" text chunks as Gemini
+        produces them and an "excerpts" list, and finally "done" with the
+        composed summary/excerpts.
+        """
+        bare_poi = await POI.get(place_id)
+        if bare_poi is None:
+            raise KeyError("place not found")
+        yield "poi", bare_poi.model_dump(mode="json")
+        overview = await get_ratings_service().get_category_overview(place_id)
+        yield "overview", {"categories_overview": [o.model_dump(mode="json") for o in overview]}
+
+        categories = selected_categories(user_preferences)
+        self._mark_served(place_id, categories)
+        keys, found = await self._cached_profiles(bare_poi, categories)
+        events: asyncio.Queue[Tuple[str, Dict[str, Any]]] = asyncio.Queue()
+
+        async def produce(category: DisabilityCategory) -> POIProfile:
+            streamed = False
+
+            def on_chunk(text: str):
+                nonlocal streamed
+                streamed = True
+                events.put_nowait(("summary", {"category": category.value, "text": text}))
+
+            key = keys[category]
+            profile = found.get(key) or await self._generate_profile(bare_poi, category, key, on_chunk)
+            self.profile_cache.put(key, profile)
+            if not streamed:
+                # Cached, or generated by another request: send the whole summary at once
+                on_chunk(profile.relevant_summary)
+            events.put_nowait(("excerpts", {"category": category.value, "excerpts": profile.relevant_review_excerpts}))
+            return profile
+
+        producers = [asyncio.ensure_future(produce(c)) for c in categories]
+        finished = asyncio.gather(*producers)
+        try:
+            while not finished.done() or not events.empty():
+                getter = asyncio.ensure_future(events.get())
+                await asyncio.wait({getter, finished}, return_when=asyncio.FIRST_COMPLETED)
+                if getter.done():
+                    yield getter.result()
+                else:
+                    getter.cancel()
+            summary, excerpts = compose_profiles(finished.result())
+        finally:
+            # Generations themselves are shielded and still land in the cache
+            for producer in producers:
+                producer.cancel()
+        yield "done", {"relevant_summary": summary, "relevant_review_excerpts": excerpts}
+
+    async def _cached_profiles(
+        self, bare_poi: POI, categories: List[DisabilityCategory]
+    ) -> Tuple[Dict[DisabilityCategory, str], Dict[str, POIProfile]]:
+        """Profile keys at the POI's current review version, and those found in the LRU or MongoDB."""
+        keys = {c: profile_key(bare_poi.id, c, bare_poi.review_version) for c in categories}
+        found: Dict[str, POIProfile] = {}
+        for key in keys.values():
+            profile = self.profile_cache.get(key)
+            if profile is not None:
+                found[key] = profile
+        missing = [key for key in keys.values() if key not in found]
+        if missing:
+            for profile in await POIProfile.find(In(POIProfile.id, missing)).to_list():
+                found[profile.id] = profile
+        return keys, found
+
+    async def _category_profiles(self, bare_poi: POI, categories: List[DisabilityCategory]) -> List[POIProfile]:
+        """Per-category profiles at the POI's current review version: LRU, then MongoDB, then Gemini."""
+        keys, found = await self._cached_profiles(bare_poi, categories)
+        cold = [c for c, key in keys.items() if key not in found]
+        if cold:
+            built = await asyncio.gather(*[self._generate_profile(bare_poi, c, keys[c]) for c in cold])
+            found.update((profile.id, profile) for profile in built)
+        for key in keys.values():
+            self.profile_cache.put(key, found[key])
+        return [found[key] for key in keys.values()]
+
+    async def _generate_profile(
+        self,
+        bare_poi: POI,
+        category: DisabilityCategory,
+        key: str,
+        on_chunk: Optional[Callable[[str], None]] = None,
+    ) -> POIProfile:
+        # Concurrent requests (and the background pipeline) share one generation per profile;
+        # only the request that starts it receives streamed summary chunks
+        pending = self._generating.get(key)
+        if pending is None:
+            pending = self._generating[key] = asyncio.ensure_future(
+                self._build_profile(key, bare_poi, category, on_chunk)
+            )
+            pending.add_done_callback(lambda _: self._generating.pop(key, None))
+        return await asyncio.shield(pending)
+
+    async def _build_profile(
+        self,
+        key: str,
+        bare_poi: POI,
+        category: DisabilityCategory,
+        on_chunk: Optional[Callable[[str], None]] = None,
+    ) -> POIProfile:
+        # Bounded by count and token budget, however many reviews the POI has
+        poi_reviews = await get_reviews_service().select_for_prompt(bare_poi.id, [category])
+        contents = {
+            "reviews": poi_reviews,
+            "disability_categories": [category.value]
         }
-        Output format:
-        Return valid JSON in the following structure:
-        {
-        "relevant_excerpts": [
-            "<excerpt from review 0>",
-            "<excerpt from review 1>",
-            "<excerpt from review 2>",
-            "..."
-        ]
 
+        # Excerpts come from the local embedding index while the summary is generated
+        summary, excerpts = await asyncio.gather(
+            self._summarize(contents, on_chunk),
+            get_reviews_service().select_excerpts(bare_poi.id, category),
+        )
 
-        Additional rules:
+        profile = POIProfile(
+            id=key,
+            poi_id=bare_poi.id,
+            category=category,
+            review_version=bare_poi.review_version,
+            relevant_summary=summary,
+            relevant_review_excerpts=excerpts,
+        )
+        await profile.save()
+        # A review that arrived during generation has already deleted this POI's profiles; this one
+        # was saved after that and would never be read, so it is removed here instead of piling up
+        current = await POI.find_one(POI.id == bare_poi.id, projection_model=POIReviewVersion)
+        if current is not None and current.review_version != bare_poi.review_version:
+            await profile.delete()
+        return profile
 
-        review_index should match the zero-based index of the review in the input list.
+    async def _summarize(self, contents: Dict[str, Any], on_chunk: Optional[Callable[[str], None]] = None) -> str:
+        if on_chunk is None:
+            summary = await self.client.models.generate_content(
+                model=self.model,
+                contents=[SUMMARY_PROMPT, contents]
+            )
+            return summary.text or ""
+        parts: List[str] = []
+        async for chunk in await self.client.models.generate_content_stream(
+            model=self.model,
+            contents=[SUMMARY_PROMPT, contents]
+        ):
+            if chunk.text:
+                parts.append(chunk.text)
+                on_chunk(chunk.text)
+        return "".join(parts)
 
-        Do not include duplicate excerpts.
+    async def get_places_nearby(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_m: float,
+        limit: int = 50,
+        offset: int = 0,
+        user_preferences: Optional[UserPreferences] = None,
+    ) -> List[POI_PARTIAL_DTO]:
+        """
+        POIs within radius_m of a point, ranked by proximity and by how well they
+        serve the user's categories. Only the nearest rank_candidates are ranked,
+        so pages end there.
+        """
+        query = {"location": {"$nearSphere": {
+            "$geometry": {"type": "Point", "coordinates": [longitude, latitude]},
+            "$maxDistance": radius_m,
+        }}}
+        candidates = await POI.find(query, projection_model=POI_PARTIAL_DTO).limit(self.rank_candidates).to_list()
+        return await self._rank(
+            candidates,
+            user_preferences,
+            origin=(latitude, longitude),
+            distance_scale_m=radius_m,
+            offset=offset,
+            limit=limit,
+        )
 
-        Do not infer accessibility features that are not explicitly stated.
+    async def get_places_within(
+        self,
+        min_lat: float,
+        min_lon: float,
+        max_lat: float,
+        max_lon: float,
+        limit: int = 200,
+        offset: int = 0,
+        user_preferences: Optional[UserPreferences] = None,
+    ) -> List[POI_PARTIAL_DTO]:
+        """POIs inside a map viewport; served by the 2dsphere index."""
+        if min_lat >= max_lat or min_lon >= max_lon:
+            raise ValueError("bounding box must have min < max (viewports crossing the antimeridian are not supported)")
+        ring = [[min_lon, min_lat], [max_lon, min_lat], [max_lon, max_lat], [min_lon, max_lat], [min_lon, min_lat]]
+        query = {"location": {"$geoWithin": {"$geometry": {"type": "Polygon", "coordinates": [ring]}}}}
+        places = await (
+            POI.find(query, projection_model=POI_PARTIAL_DTO).sort("_id").skip(offset).limit(limit).to_list()
+        )
+        # Kept in _id order so pages are stable; only relevant_categories is filled
+        scores = await self._accessibility_scores()
+        return self.ranker.annotate(places, scores, selected_categories(user_preferences or UserPreferences()))
 
-        Extract the relevant excerpts now based on the provided input.
+    async def search_places(
+        self,
+        query: str,
+        limit: int = 10,
+        user_preferences: Optional[UserPreferences] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+    ) -> List[POI_PARTIAL_DTO]:
         """
+        POIs whose name or categories match the query. Typos and unfinished words
+        are tolerated. Results are ranked by match quality, accessibility for the
+        user's categories and, when a location is given, proximity.
+        """
+        matches = self.search_index.matches(query, self.rank_candidates)
+        origin = (latitude, longitude) if latitude is not None and longitude is not None else None
+        return await self._rank(
+            [place for place, _ in matches],
+            user_preferences,
+            origin=origin,
+            text_scores=[score for _, score in matches],
+            limit=limit,
+        )
 
-        excerpts = await self.client.models.generate_content(
-            model=self.model,
-            contents=[
-                excerpts_prompt,
-                {
-                    "reviews": poi_reviews,
-                    "disability_categories": user_preferences.selected_categories
-                }
-            ]
+    def _new_search_index(self) -> PlaceSearchIndex:
+        return PlaceSearchIndex(
+            max_expansions=int(getenv('PLACES_SEARCH_MAX_EXPANSIONS', '64')),
+            min_similarity=float(getenv('PLACES_SEARCH_MIN_SIMILARITY', '0.3')),
+            max_postings=int(getenv('PLACES_SEARCH_MAX_POSTINGS', '256')),
         )
 
+    async def _maintain_search_index(self):
+        """Build the search index, then rebuild it into a fresh one and swap, every search_refresh_s."""
+        index = self.search_index
+        while True:
+            self._search_building = index
+            try:
+                await index.build()
+                self.search_index = index
+            except Exception as e:
+                logger.warning(f"Building the place search index failed: {e!r}")
+            finally:
+                self._search_building = None
+            if self.search_refresh_s <= 0:
+                return
+            await asyncio.sleep(self.search_refresh_s)
+            index = self._new_search_index()
+
+    async def _accessibility_scores(self) -> AccessibilityScores:
+        scores = get_ratings_service().scores
+        await scores.ensure_loaded()
+        return scores
+
+    async def _rank(
+        self, places: List[POI_PARTIAL_DTO], user_preferences: Optional[UserPreferences], **signals
+    ) -> List[POI_PARTIAL_DTO]:
+        scores = await self._accessibility_scores()
+        categories = selected_categories(user_preferences or UserPreferences())
+        return self.ranker.rank(places, scores, categories, **signals)
+
+    def schedule_refresh(self, place_id: str, categories: Optional[Set[DisabilityCategory]] = None):
+        """Queue a POI for the background pipeline to generate missing profiles (all categories by default)."""
+        queued = self._queued.get(place_id)
+        if queued is None:
+            self._queued[place_id] = set(categories or DisabilityCategory)
+            self._refresh_queue.put_nowait(place_id)
+        else:
+            queued.update(categories or DisabilityCategory)
+
+    def _mark_served(self, place_id: str, categories: List[DisabilityCategory]):
+        now = time.monotonic()
+        entry = self._served.pop(place_id, None)
+        served = set(categories)
+        if entry is not None and now - entry[0] <= self.refresh_served_within_s:
+            served |= entry[1]
+        self._served[place_id] = (now, served)
+        # Oldest first, so expired entries are all at the front
+        while self._served and now - next(iter(self._served.values()))[0] > self.refresh_served_within_s:
+            self._served.popitem(last=False)
+
+    def _recently_served(self, place_id: str) -> Optional[Set[DisabilityCategory]]:
+        entry = self._served.get(place_id)
+        if entry is None or time.monotonic() - entry[0] > self.refresh_served_within_s:
+            return None
+        return entry[1]
+
+    async def precompute_all(self):
+        """Queue every POI; profiles that already exist at the current review version are skipped."""
+        async for poi in POI.find_all(projection_model=POIRef):
+            self.schedule_refresh(poi.id)
+
+    async def _profile_worker(self):
+        while True:
+            place_id = await self._refresh_queue.get()
+            categories = self._queued.pop(place_id, set())
+            try:
+                bare_poi = await POI.get(place_id)
+                if bare_poi is not None:
+                    await self._category_profiles(bare_poi, [c for c in DisabilityCategory if c in categories])
+            except Exception as e:
+                logger.warning(f"Profile generation failed for {place_id}: {e!r}")
+
+    async def invalidate_place(self, place_id: str):
+        """
+        A review was added: bump the POI's review version and drop its stale
+        profiles. Only categories read within refresh_served_within_s are
+        regenerated now; anything else is generated on its next read, so a
+        bulk import does not turn into an LLM call per POI and category.
+        """
+        await POI.find_one(POI.id == place_id).update(Inc({POI.review_version: 1}))
+        self.profile_cache.invalidate(place_id)
+        await POIProfile.find(POIProfile.poi_id == place_id).delete()
+        served = self._recently_served(place_id)
+        if served:
+            self.schedule_refresh(place_id, served)
+
+    async def shutdown(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
     # async def generate_summary(self, place: POI) -> str:
     #     """Generate a summary of the place using Gemini AI"""
     #     prompt = f"Create a brief summary of this place: {place.name}. {place.description}"
@@ -121,6 +486,11 @@ class PlacesService:
 
     async def create_place(self, place_data: POI):
         await place_data.insert()
+        place = POI_PARTIAL_DTO(**place_data.model_dump())
+        self.search_index.add(place)
+        if self._search_building is not None and self._search_building is not self.search_index:
+            # A rebuild in progress may already have read past this place
+            self._search_building.add(place)
 
 service = None
 
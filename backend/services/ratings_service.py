@@ -1,12 +1,157 @@
 
 from models.poi_ratings import POIRating
+from models.poi_rating_aggregate import POIRatingAggregate, CategoryRatingAggregate
+from models.category_user_rating import CategoryRating
+from models.category_enum import DisabilityCategory
+from dtos.poi_full_dto import RatingsPerCategory
+from services.bulk_insert import BulkWriteCounts, insert_unordered
+from services.place_ranking import AccessibilityScores
+from services.write_buffer import WriteBehindBuffer
+from beanie.operators import In
+from pymongo import ReplaceOne, ReturnDocument, UpdateOne
+from typing import Dict, List, Optional
+from os import getenv
+
+STARS = range(1, 6)
+
+
+def star_bucket(score: float) -> str:
+    # 0-5 scores round half up into the 1-5 star histogram
+    return f"{min(5, max(1, int(score + 0.5)))}_star"
+
+
+def rating_increments(ratings: List[CategoryRating]) -> Dict[str, float]:
+    """$inc document applying one rating event to a POIRatingAggregate."""
+    inc: Dict[str, float] = {}
+    for rating in ratings:
+        prefix = f"categories.{rating.category.value}"
+        for path, amount in (
+            (f"{prefix}.count", 1),
+            (f"{prefix}.sum", rating.score),
+            (f"{prefix}.histogram.{star_bucket(rating.score)}", 1),
+        ):
+            inc[path] = inc.get(path, 0) + amount
+    return inc
 
 
 class RatingsService:
+    def __init__(self):
+        # Per-POI score vectors used to rank place listings, kept current on every rating
+        self.scores = AccessibilityScores(
+            prior_mean=float(getenv('RATINGS_PRIOR_MEAN', '2.5')),
+            prior_count=float(getenv('RATINGS_PRIOR_COUNT', '3')),
+            ttl_s=float(getenv('RATINGS_SCORES_TTL_S', '300')),
+        )
+        self.bulk_chunk_size = int(getenv('RATINGS_BULK_CHUNK_SIZE', '1000'))
+        # Opt-in: single ratings are acknowledged when buffered and written in batches
+        self.write_buffer: Optional[WriteBehindBuffer[POIRating]] = None
+        if getenv('RATINGS_WRITE_BEHIND', '0') == '1':
+            self.write_buffer = WriteBehindBuffer(
+                "ratings",
+                self.create_ratings,
+                max_items=int(getenv('RATINGS_WRITE_BUFFER_SIZE', '500')),
+                max_delay_s=float(getenv('RATINGS_WRITE_BUFFER_DELAY_S', '1.0')),
+            )
+
     async def create_rating(self, rating: POIRating):
+        if self.write_buffer is not None:
+            await self.write_buffer.add(rating)
+            return rating
         await rating.insert()
+        await self.apply_to_aggregate(rating)
         return rating
 
+    async def create_ratings(self, ratings: List[POIRating]) -> BulkWriteCounts:
+        """
+        Insert ratings with unordered insert_many in chunks, folding the
+        ratings each chunk actually wrote into the aggregates.
+        """
+        inserted = failed = 0
+        for start in range(0, len(ratings), self.bulk_chunk_size):
+            written, chunk_failed = await insert_unordered(POIRating, ratings[start:start + self.bulk_chunk_size])
+            inserted += len(written)
+            failed += chunk_failed
+            await self.apply_to_aggregates(written)
+        return BulkWriteCounts(inserted, failed)
+
+    async def apply_to_aggregate(self, rating: POIRating):
+        inc = rating_increments(rating.ratings or [])
+        if inc:
+            aggregate = await POIRatingAggregate.get_pymongo_collection().find_one_and_update(
+                {"_id": rating.poi_id}, {"$inc": inc}, upsert=True, return_document=ReturnDocument.AFTER
+            )
+            self.scores.set(rating.poi_id, POIRatingAggregate.model_validate(aggregate).categories)
+
+    async def apply_to_aggregates(self, ratings: List[POIRating]):
+        """apply_to_aggregate for many ratings: one summed $inc per POI in a single unordered bulk write."""
+        increments: Dict[str, Dict[str, float]] = {}
+        for rating in ratings:
+            merged = increments.setdefault(rating.poi_id, {})
+            for path, amount in rating_increments(rating.ratings or []).items():
+                merged[path] = merged.get(path, 0) + amount
+        ops = [UpdateOne({"_id": poi_id}, {"$inc": inc}, upsert=True) for poi_id, inc in increments.items() if inc]
+        if not ops:
+            return
+        await POIRatingAggregate.get_pymongo_collection().bulk_write(ops, ordered=False)
+        async for aggregate in POIRatingAggregate.find(In(POIRatingAggregate.id, list(increments))):
+            self.scores.set(aggregate.id, aggregate.categories)
+
+    async def get_category_overview(self, poi_id: str) -> List[RatingsPerCategory]:
+        """Per-category average and star distribution from the POI's aggregate document."""
+        aggregate = await POIRatingAggregate.get(poi_id)
+        if aggregate is None:
+            return []
+        overview = []
+        for category in DisabilityCategory:
+            totals = aggregate.categories.get(category.value)
+            if not totals or not totals.count:
+                continue
+            average = totals.sum / totals.count
+            overview.append(RatingsPerCategory(
+                category=category,
+                average_rating=round(average, 2),
+                distribution={f"{s}_star": totals.histogram.get(f"{s}_star", 0) for s in STARS},
+                summary=f"{average:.1f} out of 5 from {totals.count} rating{'s' if totals.count != 1 else ''}",
+            ))
+        return overview
+
+    async def backfill_aggregates(self, chunk_size: int = 1000) -> int:
+        """Rebuild every POIRatingAggregate from the poi_ratings collection; returns POIs written."""
+        score = "$ratings.score"
+        pipeline = [
+            {"$unwind": "$ratings"},
+            {"$group": {
+                "_id": {
+                    "poi_id": "$poi_id",
+                    "category": "$ratings.category",
+                    "star": {"$min": [5, {"$max": [1, {"$floor": {"$add": [score, 0.5]}}]}]},
+                },
+                "count": {"$sum": 1},
+                "sum": {"$sum": score},
+            }},
+        ]
+        aggregates: Dict[str, Dict[str, CategoryRatingAggregate]] = {}
+        async for row in POIRating.get_pymongo_collection().aggregate(pipeline):
+            key = row["_id"]
+            totals = aggregates.setdefault(key["poi_id"], {}).setdefault(key["category"], CategoryRatingAggregate())
+            totals.count += row["count"]
+            totals.sum += row["sum"]
+            totals.histogram[f"{int(key['star'])}_star"] = row["count"]
+
+        collection = POIRatingAggregate.get_pymongo_collection()
+        ops = [
+            ReplaceOne({"_id": poi_id}, {"categories": {c: t.model_dump() for c, t in categories.items()}}, upsert=True)
+            for poi_id, categories in aggregates.items()
+        ]
+        for start in range(0, len(ops), chunk_size):
+            await collection.bulk_write(ops[start:start + chunk_size], ordered=False)
+        return len(ops)
+
+    async def shutdown(self):
+        if self.write_buffer is not None:
+            await self.write_buffer.flush()
+        await self.scores.close()
+
 service = None
 
 def init_ratings_service():
@@ -15,4 +160,4 @@ def init_ratings_service():
         service = RatingsService()  # Initialize with actual repository
 
 def get_ratings_service() -> RatingsService:
-    return service # type: ignore
\ No newline at end of file
+    return service # type: ignore
@@ -0,0 +1,267 @@
+"""
+Review sentence embeddings for picking accessibility excerpts without an
+LLM call.
+
+Each review is split into sentences and embedded once, when it is written.
+The vectors are rows of one packed float16 matrix per POI, stored in its
+POIReviewEmbeddings document. Excerpts for a category are the sentences
+most cosine-similar to that category's query vector. Sentences embedded by
+another model than the current one are re-embedded the next time the POI
+is read or written.
+"""
+from __future__ import annotations
+
+import asyncio
+import re
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from loguru import logger
+from pymongo.errors import DuplicateKeyError
+
+from models.category_enum import DisabilityCategory
+from models.review_embedding import POIReviewEmbeddings
+
+EMBEDDERS = ("sentence-transformers", "hashing")
+
+# Writers of one POI's matrix that keep losing the race give up after this many reads
+MAX_WRITE_ATTEMPTS = 5
+
+# What a relevant sentence talks about, per category; embedded and averaged into one query vector
+CATEGORY_QUERIES: Dict[DisabilityCategory, Tuple[str, ...]] = {
+    DisabilityCategory.MOBILITY_IMPAIRED: (
+        "wheelchair accessible entrance with a ramp",
+        "there are stairs and no elevator",
+        "narrow doorways and aisles, hard to get around",
+        "accessible bathroom and parking",
+    ),
+    DisabilityCategory.VISUALLY_IMPAIRED: (
+        "braille menu and clear signage",
+        "dark and hard to see, poor contrast",
+        "staff helped read the menu, guide dog welcome",
+    ),
+    DisabilityCategory.LIGHT_SENSITIVE: (
+        "harsh bright fluorescent lights",
+        "flickering lights and glare",
+        "dim soft lighting, not too bright",
+    ),
+    DisabilityCategory.SOUND_SENSITIVE: (
+        "very loud music and noisy crowd",
+        "quiet and calm atmosphere",
+        "echoing room, hard to hear",
+    ),
+    DisabilityCategory.CHRONICALLY_FATIGUED: (
+        "plenty of seating and places to rest",
+        "long wait standing in line",
+        "long walk from the entrance or parking",
+    ),
+}
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD = re.compile(r"[a-z0-9']+")
+_STOPWORDS = frozenset(
+    "a an the and or but of to in on at for with from by is are was were be been it its this that there "
+    "i we you they he she my our your their very so too not no any anything all was had has have".split()
+)
+
+
+def split_sentences(text: str, min_words: int = 3) -> List[str]:
+    return [s.strip() for s in _SENTENCE_SPLIT.split(text) if len(s.split()) >= min_words]
+
+
+class Embedder:
+    """Maps texts to L2-normalized float32 vectors of size `dim`."""
+
+    name: str
+    dim: int
+    # Cosine similarity below which a sentence is not considered an excerpt
+    min_score: float
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        raise NotImplementedError
+
+
+class SentenceTransformerEmbedder(Embedder):
+    min_score = 0.35
+
+    def __init__(self, model_name: str) -> None:
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.name = f"sentence-transformers:{model_name}"
+        self.dim = int(self.model.get_sentence_embedding_dimension())
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return self.model.encode(list(texts), normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+
+class HashingEmbedder(Embedder):
+    """
+    Dependency-free fallback: signed feature hashing of words and word
+    bigrams. It has no notion of synonyms, but matches the vocabulary of the
+    category queries well enough to rank excerpts.
+    """
+
+    min_score = 0.15
+
+    def __init__(self, dim: int = 512) -> None:
+        self.dim = dim
+        self.name = f"hashing:{dim}"
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            # Crude stemming so "lights"/"lighting"/"light" share a feature
+            words = [re.sub(r"(ing|ed|s)$", "", w) or w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS]
+            for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                h = zlib.crc32(feature.encode())
+                out[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.maximum(norms, 1e-9)
+
+
+def create_embedder(kind: str, model_name: str) -> Embedder:
+    if kind == "sentence-transformers":
+        try:
+            return SentenceTransformerEmbedder(model_name)
+        except ImportError:
+            logger.warning(
+                "sentence-transformers is not installed (the 'embeddings' extra); falling back to the hashing "
+                "embedder. Stored embeddings are re-embedded per POI when the embedder changes"
+            )
+            return HashingEmbedder()
+    if kind == "hashing":
+        return HashingEmbedder()
+    raise ValueError(f"unknown embedder {kind!r}; expected one of {EMBEDDERS}")
+
+
+class ReviewEmbeddingIndex:
+    def __init__(self, kind: str, model_name: str, max_sentences: int = 2000) -> None:
+        self.kind = kind
+        self.model_name = model_name
+        self.max_sentences = max_sentences
+        self._embedder: Optional[Embedder] = None
+        self._load_lock = asyncio.Lock()
+        self._queries: Dict[DisabilityCategory, np.ndarray] = {}
+
+    async def embedder(self) -> Embedder:
+        # The model loads on first use, off the event loop
+        if self._embedder is None:
+            async with self._load_lock:
+                if self._embedder is None:
+                    self._embedder = await asyncio.to_thread(create_embedder, self.kind, self.model_name)
+        return self._embedder
+
+    async def _query(self, category: DisabilityCategory) -> np.ndarray:
+        if category not in self._queries:
+            embedder = await self.embedder()
+            vec = (await asyncio.to_thread(embedder.encode, CATEGORY_QUERIES[category])).mean(axis=0)
+            self._queries[category] = vec / max(float(np.linalg.norm(vec)), 1e-9)
+        return self._queries[category]
+
+    async def add_review(self, poi_id: str, review_id: str, text: str) -> None:
+        """Embed a new review's sentences and append them to the POI's matrix (oldest rows drop past the cap)."""
+        await self.add_reviews(poi_id, [(review_id, text)])
+
+    async def add_reviews(self, poi_id: str, reviews: Sequence[Tuple[str, str]]) -> None:
+        """add_review for several (review_id, text) pairs of one POI, in one encode and one write."""
+        pairs = [(rid, s) for rid, text in reviews for s in split_sentences(text)]
+        if not pairs:
+            return
+        embedder = await self.embedder()
+        vectors = (await asyncio.to_thread(embedder.encode, [s for _, s in pairs])).astype(np.float16)
+        for _ in range(MAX_WRITE_ATTEMPTS):
+            doc = await POIReviewEmbeddings.get(poi_id)
+            texts, review_ids, matrix = await self._current_rows(doc, embedder)
+            texts = (texts + [s for _, s in pairs])[-self.max_sentences:]
+            review_ids = (review_ids + [rid for rid, _ in pairs])[-self.max_sentences:]
+            matrix = np.concatenate([matrix, vectors])[-self.max_sentences:]
+            if await self._write(poi_id, doc, embedder, texts, review_ids, matrix):
+                return
+        logger.warning(f"Gave up adding {len(pairs)} review sentences to {poi_id} after concurrent writes")
+
+    async def rebuild(self, poi_id: str, reviews: Sequence[Tuple[str, str]]) -> int:
+        """Replace a POI's matrix from (review_id, text) pairs, oldest first; returns sentences stored."""
+        embedder = await self.embedder()
+        pairs = [(rid, s) for rid, text in reviews for s in split_sentences(text)][-self.max_sentences:]
+        vectors = (await asyncio.to_thread(embedder.encode, [s for _, s in pairs])).astype(np.float16)
+        await POIReviewEmbeddings.get_pymongo_collection().update_one(
+            {"_id": poi_id},
+            {
+                "$set": self._fields(embedder, [s for _, s in pairs], [rid for rid, _ in pairs], vectors),
+                "$inc": {"revision": 1},
+                "$unset": {"rows": ""},  # the old one-row-per-sentence layout
+            },
+            upsert=True,
+        )
+        return len(pairs)
+
+    async def select_excerpts(self, poi_id: str, category: DisabilityCategory, k: int = 5) -> List[str]:
+        """The k sentences of a POI's reviews most similar to the category, best first."""
+        doc = await POIReviewEmbeddings.get(poi_id)
+        if doc is None or not doc.texts:
+            return []
+        embedder = await self.embedder()
+        texts, review_ids, matrix = await self._current_rows(doc, embedder)
+        if doc.model != embedder.name:
+            # Stored so the sentences are re-embedded once, not on every read
+            await self._write(poi_id, doc, embedder, texts, review_ids, matrix)
+        # Rows are unit length, so the dot product is the cosine similarity
+        scores = matrix.astype(np.float32) @ await self._query(category)
+        excerpts: List[str] = []
+        for i in np.argsort(-scores):
+            if scores[i] < embedder.min_score or len(excerpts) >= k:
+                break
+            if texts[i] not in excerpts:
+                excerpts.append(texts[i])
+        return excerpts
+
+    async def _current_rows(
+        self, doc: Optional[POIReviewEmbeddings], embedder: Embedder
+    ) -> Tuple[List[str], List[str], np.ndarray]:
+        """A POI's stored texts, review ids and matrix, re-embedded if another model produced them."""
+        if doc is None:
+            return [], [], np.zeros((0, embedder.dim), dtype=np.float16)
+        if doc.model == embedder.name:
+            return list(doc.texts), list(doc.review_ids), np.frombuffer(doc.matrix, dtype=np.float16).reshape(-1, doc.dim)
+        logger.warning(f"Review embeddings of {doc.id} are from {doc.model}; re-embedding them with {embedder.name}")
+        vectors = (await asyncio.to_thread(embedder.encode, doc.texts)).astype(np.float16)
+        return list(doc.texts), list(doc.review_ids), vectors
+
+    @staticmethod
+    def _fields(embedder: Embedder, texts: List[str], review_ids: List[str], matrix: np.ndarray) -> Dict:
+        return {
+            "model": embedder.name,
+            "dim": embedder.dim,
+            "texts": texts,
+            "review_ids": review_ids,
+            "matrix": np.ascontiguousarray(matrix, dtype=np.float16).tobytes(),
+        }
+
+    async def _write(
+        self,
+        poi_id: str,
+        doc: Optional[POIReviewEmbeddings],
+        embedder: Embedder,
+        texts: List[str],
+        review_ids: List[str],
+        matrix: np.ndarray,
+    ) -> bool:
+        """Store a POI's rows unless another writer changed them since `doc` was read."""
+        collection = POIReviewEmbeddings.get_pymongo_collection()
+        fields = self._fields(embedder, texts, review_ids, matrix)
+        if doc is None:
+            try:
+                await collection.insert_one({"_id": poi_id, **fields, "revision": 0})
+            except DuplicateKeyError:
+                return False
+            return True
+        # Documents in the old one-row-per-sentence layout have no revision yet
+        revision = doc.revision or {"$in": [0, None]}
+        result = await collection.replace_one(
+            {"_id": poi_id, "revision": revision}, {**fields, "revision": doc.revision + 1}
+        )
+        return result.matched_count == 1
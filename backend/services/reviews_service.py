@@ -1,11 +1,178 @@
 
 from models.review import Review
+from models.category_enum import DisabilityCategory
+from dtos.review_dto import ReviewListingDTO
+from services.bulk_insert import BulkWriteCounts, insert_unordered
+from services.review_embeddings import ReviewEmbeddingIndex
+from services.write_buffer import WriteBehindBuffer
+from pydantic import BaseModel
+from pymongo import DESCENDING
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from os import getenv
+import base64
+
+# Word stems that mark a review as relevant to a category when picking reviews for a prompt
+CATEGORY_KEYWORDS: Dict[DisabilityCategory, Tuple[str, ...]] = {
+    DisabilityCategory.MOBILITY_IMPAIRED: (
+        "wheelchair", "ramp", "stair", "step", "elevator", "lift", "accessible", "door", "narrow",
+        "parking", "curb", "walker", "cane", "seat", "bathroom", "washroom",
+    ),
+    DisabilityCategory.VISUALLY_IMPAIRED: (
+        "braille", "blind", "vision", "visual", "sign", "menu", "dark", "contrast", "guide dog",
+        "large print", "read", "screen reader",
+    ),
+    DisabilityCategory.LIGHT_SENSITIVE: (
+        "light", "bright", "fluorescent", "flicker", "glare", "dim", "sun", "window", "strobe",
+    ),
+    DisabilityCategory.SOUND_SENSITIVE: (
+        "noise", "noisy", "loud", "quiet", "music", "crowd", "busy", "echo", "calm", "sound",
+    ),
+    DisabilityCategory.CHRONICALLY_FATIGUED: (
+        "seat", "bench", "rest", "wait", "line", "queue", "walk", "distance", "tired", "break", "chair",
+    ),
+}
+
+
+class ReviewText(BaseModel):
+    # Projection: prompt selection only ever needs the text
+    review_text: str
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English text
+    return len(text) // 4 + 1
+
+
+def relevance(text: str, keywords: Tuple[str, ...]) -> int:
+    lowered = text.lower()
+    return sum(lowered.count(k) for k in keywords)
+
+
+def encode_cursor(review: ReviewListingDTO) -> str:
+    raw = f"{review.created_at.isoformat()}|{review.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        created_at, review_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), review_id
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("invalid cursor")
 
 
 class ReviewsService:
+    def __init__(self):
+        # Bounds on what one prompt pulls from a POI's reviews, however popular it is
+        self.scan_limit = int(getenv('REVIEWS_SCAN_LIMIT', '500'))
+        self.prompt_max_reviews = int(getenv('REVIEWS_PROMPT_MAX', '40'))
+        self.prompt_token_budget = int(getenv('REVIEWS_PROMPT_TOKEN_BUDGET', '6000'))
+        self.embeddings = ReviewEmbeddingIndex(
+            kind=getenv('REVIEW_EMBEDDER', 'sentence-transformers'),
+            model_name=getenv('REVIEW_EMBEDDING_MODEL', 'sentence-transformers/all-MiniLM-L6-v2'),
+            max_sentences=int(getenv('REVIEW_EMBEDDING_MAX_SENTENCES', '2000')),
+        )
+        self.excerpts_per_category = int(getenv('REVIEW_EXCERPTS_PER_CATEGORY', '5'))
+        self.bulk_chunk_size = int(getenv('REVIEWS_BULK_CHUNK_SIZE', '1000'))
+        # Opt-in: single reviews are acknowledged when buffered and written in batches
+        self.write_buffer: Optional[WriteBehindBuffer[Review]] = None
+        if getenv('REVIEWS_WRITE_BEHIND', '0') == '1':
+            self.write_buffer = WriteBehindBuffer(
+                "reviews",
+                self.create_reviews,
+                max_items=int(getenv('REVIEWS_WRITE_BUFFER_SIZE', '500')),
+                max_delay_s=float(getenv('REVIEWS_WRITE_BUFFER_DELAY_S', '1.0')),
+            )
+
     async def create_review(self, review: Review):
+        from services.places_service import get_places_service
+
+        if self.write_buffer is not None:
+            await self.write_buffer.add(review)
+            return
         await review.insert()
-    
+        # Sentences are embedded once here so excerpt selection needs no LLM call
+        await self.embeddings.add_review(review.poi_id, review.id, review.review_text)
+        # Cached summaries/excerpts of this POI no longer reflect its reviews
+        await get_places_service().invalidate_place(review.poi_id)
+
+    async def create_reviews(self, reviews: List[Review]) -> BulkWriteCounts:
+        """
+        Insert reviews with unordered insert_many in chunks. After each chunk,
+        the reviews it actually wrote are embedded and their POIs invalidated,
+        once per POI rather than once per review.
+        """
+        from services.places_service import get_places_service
+
+        inserted = failed = 0
+        for start in range(0, len(reviews), self.bulk_chunk_size):
+            written, chunk_failed = await insert_unordered(Review, reviews[start:start + self.bulk_chunk_size])
+            inserted += len(written)
+            failed += chunk_failed
+            by_poi: Dict[str, List[Review]] = {}
+            for review in written:
+                by_poi.setdefault(review.poi_id, []).append(review)
+            for poi_id, poi_reviews in by_poi.items():
+                await self.embeddings.add_reviews(poi_id, [(r.id, r.review_text) for r in poi_reviews])
+                await get_places_service().invalidate_place(poi_id)
+        return BulkWriteCounts(inserted, failed)
+
+    async def list_reviews(
+        self, poi_id: str, limit: int = 20, cursor: Optional[str] = None
+    ) -> Tuple[List[ReviewListingDTO], Optional[str]]:
+        """A page of a POI's reviews, newest first, and the cursor of the next page (None at the end)."""
+        query: Dict = {"poi_id": poi_id}
+        if cursor:
+            created_at, review_id = decode_cursor(cursor)
+            query["$or"] = [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "_id": {"$lt": review_id}},
+            ]
+        page = await (
+            Review.find(query, projection_model=ReviewListingDTO)
+            .sort([("created_at", DESCENDING), ("_id", DESCENDING)])
+            .limit(limit + 1)
+            .to_list()
+        )
+        next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+        return page[:limit], next_cursor
+
+    async def select_excerpts(self, poi_id: str, category: DisabilityCategory) -> List[str]:
+        """Verbatim review sentences relevant to a category, by embedding similarity."""
+        return await self.embeddings.select_excerpts(poi_id, category, self.excerpts_per_category)
+
+    async def select_for_prompt(self, poi_id: str, categories: List[DisabilityCategory]) -> List[str]:
+        """
+        The reviews worth sending to the LLM for these categories: among the
+        newest scan_limit, the most keyword-relevant (newest first on ties),
+        capped at prompt_max_reviews and prompt_token_budget tokens.
+        """
+        recent = await (
+            Review.find(Review.poi_id == poi_id, projection_model=ReviewText)
+            .sort([("created_at", DESCENDING)])
+            .limit(self.scan_limit)
+            .to_list()
+        )
+        keywords = tuple(k for c in categories for k in CATEGORY_KEYWORDS.get(c, ()))
+        ranked = sorted(range(len(recent)), key=lambda i: (-relevance(recent[i].review_text, keywords), i))
+        selected: List[str] = []
+        used = 0
+        for i in ranked:
+            if len(selected) >= self.prompt_max_reviews:
+                break
+            text = recent[i].review_text
+            cost = estimate_tokens(text)
+            if used + cost > self.prompt_token_budget:
+                continue
+            selected.append(text)
+            used += cost
+        return selected
+
+    async def shutdown(self):
+        if self.write_buffer is not None:
+            await self.write_buffer.flush()
+
 service = None
 
 def init_reviews_service():
@@ -15,4 +182,3 @@ def init_reviews_service():
 
 def get_reviews_service() -> ReviewsService:
     return service # type: ignore
-
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+# Lower rank speaks first
+DISTANCE_RANK: Dict[str, int] = {"very_close": 0, "near": 1, "far": 2}
+EVENT_RANK: Dict[str, int] = {"new_object": 0, "distance_change": 1, "position_change": 2, "lost_object": 3}
+# Moving hazards outrank people, people outrank static objects
+HAZARD_TYPES = {"car", "bus", "truck", "motorcycle", "bicycle", "train"}
+
+DISTANCE_WORDS: Dict[str, str] = {"very_close": "very close", "near": "near", "far": "far"}
+POSITION_WORDS: Dict[str, str] = {"left": "left", "center": "center", "right": "right"}
+
+
+def _type_rank(obj_type: str) -> int:
+    if obj_type in HAZARD_TYPES:
+        return 0
+    if obj_type == "person":
+        return 1
+    return 2
+
+
+def _priority(event: Tuple[str, Dict[str, Any]]) -> Tuple[int, int, int]:
+    kind, d = event
+    if kind == "lost_object":
+        # Something leaving matters less than anything still present
+        return (len(DISTANCE_RANK), _type_rank(d.get("type", "")), EVENT_RANK[kind])
+    return (
+        DISTANCE_RANK.get(d.get("distance", "far"), len(DISTANCE_RANK)),
+        _type_rank(d.get("type", "")),
+        EVENT_RANK.get(kind, len(EVENT_RANK)),
+    )
+
+
+def render_phrase(event: Tuple[str, Dict[str, Any]]) -> str:
+    kind, d = event
+    obj_type = d.get("type", "object")
+    distance = DISTANCE_WORDS.get(d.get("distance", ""), d.get("distance", ""))
+    position = POSITION_WORDS.get(d.get("position", ""), d.get("position", ""))
+    if kind == "lost_object":
+        return f"{obj_type} gone from {position}"
+    if kind == "position_change":
+        return f"{obj_type} moved {position}, {distance}"
+    return f"{obj_type} {distance}, {position}"
+
+
+def is_urgent(events: List[Tuple[str, Dict[str, Any]]]) -> bool:
+    return any(d.get("distance") == "very_close" and kind != "lost_object" for kind, d in events)
+
+
+def narrate(events: List[Tuple[str, Dict[str, Any]]], max_phrases: int = 3) -> Optional[str]:
+    """
+    Deterministic, local narration of scene events produced by
+    CVService._update_scene, e.g. "person very close, center".
+
+    Only the latest event per tracked object is spoken; phrases are ordered
+    by distance, then object type, then event kind.
+    """
+    latest: Dict[Any, Tuple[str, Dict[str, Any]]] = {}
+    for kind, d in events:
+        latest[(d.get("type"), d.get("id"))] = (kind, d)
+    if not latest:
+        return None
+    ranked = sorted(latest.values(), key=_priority)[:max_phrases]
+    text = "; ".join(render_phrase(e) for e in ranked)
+    return text[0].upper() + text[1:] + "."
@@ -0,0 +1,82 @@
+"""
+Write-behind batching of single inserts.
+
+Single writes are acknowledged once they are buffered. They reach MongoDB
+in batches, when max_items are waiting or max_delay_s after the first of
+them, whichever comes first. Anything still buffered when the process dies
+is lost, so services only buffer when this is switched on.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Generic, List, Optional, Set, TypeVar
+
+from loguru import logger
+
+from services.bulk_insert import BulkWriteCounts
+
+T = TypeVar("T")
+
+
+class WriteBehindBuffer(Generic[T]):
+    def __init__(
+        self,
+        name: str,
+        write: Callable[[List[T]], Awaitable[BulkWriteCounts]],
+        max_items: int = 500,
+        max_delay_s: float = 1.0,
+    ) -> None:
+        self.name = name
+        self.max_items = max_items
+        self.max_delay_s = max_delay_s
+        self.written = 0
+        self.dropped = 0
+        self._write = write
+        self._items: List[T] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    async def add(self, item: T) -> None:
+        self._items.append(item)
+        if len(self._items) >= self.max_items:
+            # The writer that fills a batch waits for it, which throttles producers to MongoDB's pace
+            await self._write_batch(self._take())
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_delay_s, self._on_timer)
+
+    async def flush(self) -> None:
+        """Write whatever is buffered and wait for batches already being written."""
+        if self._items:
+            await self._write_batch(self._take())
+        await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    def _take(self) -> List[T]:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._items = self._items, []
+        return batch
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        task = asyncio.create_task(self._write_batch(self._take()))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _write_batch(self, batch: List[T]) -> None:
+        if not batch:
+            return
+        try:
+            counts = await self._write(batch)
+        except Exception as e:
+            # Writers were acknowledged long ago; all that can be done is to say so
+            self.dropped += len(batch)
+            logger.error(f"Write-behind buffer {self.name} lost {len(batch)} items: {e!r}")
+            return
+        self.written += counts.inserted
+        self.dropped += counts.failed
+        if counts.failed:
+            logger.error(f"Write-behind buffer {self.name} lost {counts.failed} of {len(batch)} items")